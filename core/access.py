@@ -0,0 +1,87 @@
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import router
+from django.db.models import Q
+from .models import Proyek, Tugas, UserProfile
+from .scopecache import shared_cache
+
+# --- ACCESS-CONTROL RESOLVER ---
+# Satu sumber kebenaran untuk "grup mana saja yang boleh dilihat user ini".
+# Hasil di-memo di objek user (berlaku selama satu request) dan di-cache lintas request
+# di bawah version key yang naik setiap kali membership grup, role, atau tabel Group berubah.
+# Cache lintas request hanya dengan backend bersama (CACHE_SHARED): dengan LocMem per proses,
+# user yang dikeluarkan dari grup di satu worker tetap punya akses lama di worker lain.
+
+RISK_MANAGEMENT = 'RISK MANAGEMENT'
+RISK_SUB_GROUPS = ['RISK PROCESS CONTROL', 'PORTFOLIO MANAGEMENT & GOVERNANCE', 'RISK PRODUCT & DEVELOPMENT']
+
+ACCESS_TIMEOUT = 3600
+VERSION_KEY = 'access:version'
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    try: cache.incr(VERSION_KEY)
+    except ValueError: cache.add(VERSION_KEY, 1, None)
+
+
+def _resolve(user):
+    # Grup utama = padanan user.groups.first(), juga untuk superuser yang tergabung di grup
+    own = list(user.groups.order_by('id').values_list('id', 'name'))
+    if user.is_superuser:
+        groups = list(Group.objects.order_by('id').values_list('id', flat=True))
+        return {'ids': frozenset(groups), 'primary': own[0] if own else None}
+
+    ids = {g for g, _ in own}
+    # Role selalu dari primary: hasil resolver di-cache, lag replika tidak boleh ikut tersimpan
+    role = UserProfile.objects.using(router.db_for_write(UserProfile)).filter(user_id=user.pk).values_list('role', flat=True).first() or 'MEMBER'
+
+    # Hierarki Risk Management: Admin RM ikut melihat sub-divisi
+    if role == 'ADMIN' and any(name.upper() == RISK_MANAGEMENT for _, name in own):
+        ids.update(Group.objects.filter(name__in=RISK_SUB_GROUPS).values_list('id', flat=True))
+
+    return {'ids': frozenset(ids), 'primary': own[0] if own else None}
+
+
+def _get_access(user):
+    access = getattr(user, '_access_cache', None)
+    if access is None and not shared_cache():
+        access = user._access_cache = _resolve(user)
+    if access is None:
+        key = f"access:user:{get_version()}:{user.pk}"
+        access = cache.get(key)
+        if access is None:
+            access = _resolve(user)
+            cache.set(key, access, ACCESS_TIMEOUT)
+        user._access_cache = access
+    return access
+
+
+def get_accessible_group_ids(user):
+    """Frozenset ID grup yang bisa diakses user (superuser: semua grup)."""
+    return _get_access(user)['ids']
+
+
+def get_primary_group(user):
+    """(id, name) grup utama user -- padanan user.groups.first() -- atau None."""
+    return _get_access(user)['primary']
+
+
+def visible_tasks(user, qs=None):
+    """Tugas yang boleh dilihat user: milik grup yang bisa diakses ATAU ditugaskan ke dia."""
+    qs = Tugas.objects.all() if qs is None else qs
+    if user is None or user.is_superuser: return qs
+    return qs.filter(Q(pemilik_grup_id__in=get_accessible_group_ids(user)) | Q(ditugaskan_ke=user))
+
+
+def visible_projects(user, qs=None):
+    qs = Proyek.objects.all() if qs is None else qs
+    if user is None or user.is_superuser: return qs
+    return qs.filter(pemilik_grup_id__in=get_accessible_group_ids(user))
@@ -1,8 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+import hashlib
 from django import forms
-from .models import Proyek, Tugas, UserProfile, AuditLog
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from .models import Proyek, Tugas, UserProfile, AuditLog, AuditLogArchive
 
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
@@ -42,4 +46,29 @@ except: pass
 admin.site.register(User, UserAdmin)
 admin.site.register(Proyek)
 admin.site.register(Tugas)
-admin.site.register(AuditLog)
\ No newline at end of file
+
+# --- AUDIT LOG ---
+class CachedCountPaginator(Paginator):
+    # COUNT(*) tabel audit mahal; hasil hitung per query di-cache sebentar
+    @cached_property
+    def count(self):
+        key = "admin:count:" + hashlib.md5(str(self.object_list.query).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, 300)
+        return count
+
+class AuditLogAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'user', 'action', 'target_model', 'target_id')
+    list_filter = ('action', 'target_model')
+    search_fields = ('target_id',)
+    list_select_related = ('user',)
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+class AuditLogArchiveAdmin(AuditLogAdmin):
+    list_display = ('bulan',) + AuditLogAdmin.list_display
+
+admin.site.register(AuditLog, AuditLogAdmin)
+admin.site.register(AuditLogArchive, AuditLogArchiveAdmin)
\ No newline at end of file
@@ -1,4 +1,10 @@
 from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
\ No newline at end of file
+    name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401 (daftarkan receiver)
+        from .sqlite import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='core.sqlite.configure_sqlite')
\ No newline at end of file
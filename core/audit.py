@@ -0,0 +1,93 @@
+import contextvars
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .filters import apply_audit_filters, audit_date_range
+from .models import AuditLog, AuditLogArchive
+
+# --- AUDIT SINK (buffer per transaksi) ---
+# log_activity di dalam blok `audited_atomic()` tidak INSERT satu per satu: entri ditampung lalu
+# ditulis dengan bulk_create di akhir blok, masih di dalam transaksi yang sama. Entri ikut
+# commit/rollback bersama perubahannya; gagal menulis audit log membatalkan perubahan itu juga.
+
+BULK_BATCH_SIZE = 1000
+_current = contextvars.ContextVar('audit_buffer', default=None)
+
+
+class AuditBuffer:
+    def __init__(self, depth, batch_size=None):
+        self.entries, self.depth, self.batch_size = [], depth, batch_size
+
+    def add(self, entry):
+        self.entries.append(entry)
+        if self.batch_size and len(self.entries) >= self.batch_size: self.flush()
+
+    def flush(self):
+        entries, self.entries = self.entries, []
+        if entries: AuditLog.objects.bulk_create(entries, batch_size=BULK_BATCH_SIZE)
+
+
+@contextmanager
+def audited_atomic(batch_size=None):
+    """transaction.atomic yang menulis audit log blok ini sebelum commit; batch_size > 0 = flush tiap N entri (mode bulk)."""
+    with transaction.atomic():
+        buf = AuditBuffer(len(transaction.get_connection().atomic_blocks), batch_size)
+        token = _current.set(buf)
+        try:
+            yield buf
+            buf.flush()  # exception di blok: entri dibuang bersama rollback
+        finally:
+            _current.reset(token)
+
+
+def log_activity(user, action, model_name, obj_id, details):
+    entry = AuditLog(user=user, action=action, target_model=model_name, target_id=str(obj_id), details=details)
+    buf = _current.get()
+    # Di luar audited_atomic, atau di savepoint di dalamnya (bisa rollback sendiri): tulis langsung
+    if buf is None or len(transaction.get_connection().atomic_blocks) != buf.depth: entry.save(); return
+    buf.add(entry)
+
+
+# --- PARTISI BULANAN (tabel aktif + arsip) ---
+# Tabel aktif menyimpan AUDIT_RETENTION_MONTHS bulan terakhir; sisanya di AuditLogArchive
+# (atau file gzip). Query rentang tanggal hanya menyentuh partisi yang beririsan.
+
+def retention_months():
+    return getattr(settings, 'AUDIT_RETENTION_MONTHS', 6)
+
+
+def month_start(value):
+    if isinstance(value, datetime): value = timezone.localtime(value).date()
+    return value.replace(day=1)
+
+
+def retention_cutoff(months=None, today=None):
+    """Awal bulan pertama yang tetap di tabel aktif (aware datetime)."""
+    months = retention_months() if months is None else months
+    first = month_start(today or timezone.localdate())
+    total = first.year * 12 + first.month - 1 - months
+    return timezone.make_aware(datetime.combine(date(total // 12, total % 12 + 1, 1), time.min))
+
+
+def hot_boundary():
+    # Timestamp tertua di tabel aktif (index audit_timestamp_idx, tanpa scan)
+    return AuditLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+
+
+def audit_partitions(params):
+    """Queryset per partisi (arsip dulu, lalu tabel aktif) yang perlu dibaca untuk filter `params`."""
+    date_from, date_to = audit_date_range(params)
+    boundary = hot_boundary()
+    boundary_day = timezone.localdate(boundary) if boundary else None
+
+    parts = []
+    if boundary is None or date_from is None or date_from <= boundary_day:
+        archive = apply_audit_filters(AuditLogArchive.objects.all(), params)
+        if date_from: archive = archive.filter(bulan__gte=month_start(date_from))
+        if date_to: archive = archive.filter(bulan__lte=date_to)
+        parts.append(archive)
+    if boundary is not None and (date_to is None or date_to >= boundary_day):
+        parts.append(apply_audit_filters(AuditLog.objects.all(), params))
+    return parts
@@ -0,0 +1,163 @@
+from datetime import datetime
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .audit import audited_atomic, log_activity
+from .dag import reschedule_many
+from .models import Tugas, apply_rollup, path_ancestor_ids
+from .scopecache import invalidate_scopes, invalidate_tasks
+from .stats import bump_generation
+
+# --- BATCH MUTATION (Gantt / daftar tugas) ---
+# Banyak perubahan progress/tanggal/status dalam satu request: satu SELECT, satu transaksi,
+# satu bulk_update, roll-up & geser jadwal turunan sekaligus. Hasil dilaporkan per item.
+
+MAX_BATCH = 500
+BATCH_FIELDS = ['progress', 'status', 'tanggal_mulai', 'tenggat_waktu', 'tanggal_selesai_aktual', 'versi']
+STATUS_LABELS = dict(Tugas.STATUS_CHOICES)
+# Kolom minimum untuk fast path (validasi, izin, roll-up) - bukan seluruh baris
+FAST_FIELDS = ('id', 'kode_tugas', 'versi', 'progress', 'status', 'tanggal_mulai', 'tenggat_waktu', 'tanggal_selesai_aktual', 'proyek_id', 'jalur', 'ditugaskan_ke_id', 'pemilik_grup_id')
+
+
+class VersionConflict(Exception):
+    def __init__(self, current):
+        super().__init__("Tugas sudah diubah pengguna lain. Muat ulang halaman.")
+        self.current = current
+
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def progress_status(prog, status):
+    # Status mengikuti progress (100 -> DONE, mulai dikerjakan -> IN_PROGRESS, 0 -> TODO)
+    if prog == 100: return 'DONE'
+    if prog > 0 and status == 'TODO': return 'IN_PROGRESS'
+    if prog == 0: return 'TODO'
+    return status
+
+
+def task_state(row):
+    return {
+        'id': row['id'], 'version': row['versi'], 'progress': row['progress'],
+        'status': row['status'], 'status_display': STATUS_LABELS.get(row['status']),
+        'start': str(row['tanggal_mulai']), 'end': str(row['tenggat_waktu']),
+    }
+
+
+# --- FAST PATH (API per-tugas) ---
+# Satu SELECT kolom minimum + satu UPDATE bersyarat (WHERE id=? AND versi=?) hanya untuk
+# kolom yang berubah; tanpa save() penuh. Versi basi dilaporkan sebagai konflik.
+
+def load_state(pk):
+    return Tugas.objects.filter(pk=pk).values(*FAST_FIELDS).first()
+
+
+def fast_update(row, version, **values):
+    """Tulis `values` jika versi masih cocok; return state baru atau VersionConflict."""
+    expected = row['versi'] if version is None else int(version)
+    if expected != row['versi']: raise VersionConflict(row)
+    # Aturan sama dengan apply_change (batch): UPDATE langsung melewati validasi form/model
+    if 'progress' in values and not 0 <= values['progress'] <= 100: raise ValueError("Progress harus 0-100")
+    if values.get('tenggat_waktu', row['tenggat_waktu']) < values.get('tanggal_mulai', row['tanggal_mulai']):
+        raise ValueError("Tanggal selesai tidak boleh mendahului tanggal mulai")
+    if values.get('status') == 'DONE' and not row['tanggal_selesai_aktual']:
+        values['tanggal_selesai_aktual'] = timezone.localdate()
+
+    with transaction.atomic():
+        if not Tugas.objects.filter(pk=row['id'], versi=expected).update(versi=F('versi') + 1, **values):
+            raise VersionConflict(load_state(row['id']))
+        delta = values.get('progress', row['progress']) - row['progress']
+        if delta: apply_rollup({i: (delta, 0) for i in path_ancestor_ids(row['jalur'])}, {row['proyek_id']: (delta, 0)})
+    # update() tidak memicu post_save: dashboard hanya peduli status, cache Gantt/kalender selalu
+    if values.get('status', row['status']) != row['status']: bump_generation(scopes=False)
+    invalidate_scopes([row['pemilik_grup_id']], [row['ditugaskan_ke_id']], [row['proyek_id']], path_ancestor_ids(row['jalur']))
+    return dict(row, **values, versi=expected + 1)
+
+
+def apply_change(t, change):
+    """Validasi & terapkan satu perubahan ke objek di memori (aturan sama dengan API per-tugas)."""
+    if change.get('version') is not None and int(change['version']) != t.versi:
+        raise VersionConflict(t)
+    notes = []
+    if 'progress' in change:
+        prog = int(change['progress'])
+        if not 0 <= prog <= 100: raise ValueError("Progress harus 0-100")
+        t.progress, t.status = prog, progress_status(prog, t.status)
+        notes.append(f"Progress: {prog}%")
+
+    if 'start' in change or 'end' in change:
+        s = _parse_day(change['start']) if change.get('start') else t.tanggal_mulai
+        e = _parse_day(change['end']) if change.get('end') else t.tenggat_waktu
+        if s.weekday() >= 5: raise ValueError("Hari Libur!")
+        if e < s: raise ValueError("Tanggal selesai tidak boleh mendahului tanggal mulai")
+        t.tanggal_mulai, t.tenggat_waktu = s, e
+        notes.append(f"Gantt: {s}->{e}")
+
+    if 'status' in change:
+        if change['status'] not in STATUS_LABELS: raise ValueError(f"Status tidak dikenal: {change['status']}")
+        if change['status'] == 'DONE' and t.progress < 100: raise ValueError("Status DONE hanya boleh jika Progress 100%.")
+        t.status = change['status']
+        notes.append(f"Status: {t.status}")
+
+    if not notes: raise ValueError("Tidak ada perubahan")
+    if t.status == 'DONE' and not t.tanggal_selesai_aktual: t.tanggal_selesai_aktual = timezone.localdate()
+    return notes
+
+
+def apply_batch(user, changes, can_edit):
+    """changes: [{'id', 'version'?, 'progress'?, 'start'?, 'end'?, 'status'?}]; return (hasil per item, turunan yang digeser)."""
+    with audited_atomic():
+        results, dirty, shifted = _apply_batch(changes, can_edit)
+        for t, notes in dirty.values():
+            log_activity(user, 'UPDATE', 'Tugas', t.kode_tugas, "Batch " + "; ".join(notes))
+    if dirty:
+        bump_generation(scopes=False)  # bulk_update tidak memicu post_save
+        invalidate_tasks([*dirty, *shifted])
+    return results, shifted
+
+
+def _apply_batch(changes, can_edit):
+    ids = {c.get('id') for c in changes if isinstance(c, dict)}
+    # Baris dikunci sampai commit (PostgreSQL), jadi cek versi di bawah tetap valid saat ditulis
+    tasks = Tugas.objects.select_for_update().in_bulk([i for i in ids if isinstance(i, int)])
+
+    results, dirty, rescheduled = [], {}, []
+    for change in changes:
+        t = tasks.get(change.get('id')) if isinstance(change, dict) else None
+        if t is None:
+            results.append({'id': change.get('id') if isinstance(change, dict) else None, 'error': 'Tugas tidak ditemukan'})
+            continue
+        if not can_edit(t):
+            results.append({'id': t.pk, 'error': 'Permission denied'})
+            continue
+        before = (t.progress, t.status, t.tanggal_mulai, t.tenggat_waktu, t.tanggal_selesai_aktual)
+        try:
+            notes = apply_change(t, change)
+        except VersionConflict as e:
+            results.append({'id': t.pk, 'error': str(e), 'task': task_state(_row(t))})
+            continue
+        except (ValueError, TypeError) as e:
+            t.progress, t.status, t.tanggal_mulai, t.tenggat_waktu, t.tanggal_selesai_aktual = before
+            results.append({'id': t.pk, 'error': str(e)})
+            continue
+        dirty.setdefault(t.pk, (t, []))[1].extend(notes)
+        if (t.tanggal_mulai, t.tenggat_waktu) != before[2:4]: rescheduled.append(t)
+        results.append({'id': t.pk, 'status': 'success', 'new_status': t.get_status_display(), 'version': t.versi + 1})
+
+    if not dirty: return results, dirty, {}
+    for t, _ in dirty.values(): t.versi += 1
+    Tugas.objects.bulk_update([t for t, _ in dirty.values()], BATCH_FIELDS)
+    # Roll-up: delta progress terhadap snapshot saat dimuat
+    task_deltas, project_deltas = {}, {}
+    for t, _ in dirty.values():
+        delta = t.progress - t._rollup_state[0]
+        if not delta: continue
+        for target, key in [(task_deltas, i) for i in path_ancestor_ids(t.jalur)] + [(project_deltas, t.proyek_id)]:
+            target[key] = (target.get(key, (0, 0))[0] + delta, 0)
+    apply_rollup(task_deltas, project_deltas)
+    return results, dirty, reschedule_many(rescheduled)
+
+
+def _row(t):
+    return {f: getattr(t, f) for f in FAST_FIELDS}
@@ -0,0 +1,82 @@
+import calendar
+from datetime import date, timedelta
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+from .audit import audited_atomic, log_activity
+from .models import TemplateBAU, Tugas
+from .stats import bump_generation
+
+# --- BAU GENERATION ENGINE ---
+# 1. Hitung semua periode (awal periode) tiap template dalam rentang tanggal
+# 2. Satu query untuk occurrence yang sudah ada, lewat kunci unik (template_bau, periode)
+# 3. bulk_create sisanya dengan ignore_conflicts: aman dijalankan paralel dari beberapa host cron
+
+def period_start(frekuensi, d):
+    if frekuensi == 'WEEKLY': return d - timedelta(days=d.weekday())
+    if frekuensi == 'MONTHLY': return d.replace(day=1)
+    if frekuensi == 'QUARTERLY': return d.replace(month=(d.month - 1) // 3 * 3 + 1, day=1)
+    return d.replace(month=1, day=1)  # YEARLY
+
+
+def period_end(frekuensi, start):
+    if frekuensi == 'WEEKLY': return start + timedelta(days=6)
+    if frekuensi == 'MONTHLY': return start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    if frekuensi == 'QUARTERLY': return date(start.year, start.month + 2, calendar.monthrange(start.year, start.month + 2)[1])
+    return date(start.year, 12, 31)
+
+
+def next_period(frekuensi, start):
+    return period_end(frekuensi, start) + timedelta(days=1)
+
+
+def periods(frekuensi, start, end):
+    """Awal tiap periode yang beririsan dengan [start, end]."""
+    p = period_start(frekuensi, start)
+    while p <= end:
+        yield p
+        p = next_period(frekuensi, p)
+
+
+def period_suffix(frekuensi, p):
+    if frekuensi == 'WEEKLY': return f"W{p.isocalendar()[1]}"  # W42 (Minggu ke-42)
+    if frekuensi == 'MONTHLY': return p.strftime("%b-%Y")      # Nov-2025
+    if frekuensi == 'QUARTERLY': return f"Q{(p.month - 1) // 3 + 1}-{p.year}"
+    return str(p.year)
+
+
+def generate_bau(start=None, end=None, templates=None):
+    """Buat occurrence BAU yang belum ada untuk rentang [start, end]; return jumlah tugas baru."""
+    start = start or timezone.localdate()
+    end = end or start
+    templates = list(templates if templates is not None else TemplateBAU.objects.all())
+
+    wanted = [(tmpl, p) for tmpl in templates for p in periods(tmpl.frekuensi, start, end)]
+    if not wanted: return 0
+    existing = set(Tugas.objects.filter(
+        template_bau__in=templates, periode__gte=min(p for _, p in wanted), periode__lte=end,
+    ).values_list('template_bau_id', 'periode'))
+    missing = [(tmpl, p) for tmpl, p in wanted if (tmpl.pk, p) not in existing]
+    if not missing: return 0
+
+    # Insert dan entri audit log-nya satu transaksi
+    with audited_atomic():
+        first = Tugas.reserve_codes(None, len(missing))
+        codes = [f"T-{first + i:03d}" for i in range(len(missing))]
+        Tugas.objects.bulk_create([
+            Tugas(
+                kode_tugas=code, nama_tugas=f"{tmpl.nama_tugas} ({period_suffix(tmpl.frekuensi, p)})",
+                tipe_tugas='BAU', tanggal_mulai=p, tenggat_waktu=period_end(tmpl.frekuensi, p),
+                ditugaskan_ke_id=tmpl.default_pic_id, pemilik_grup_id=tmpl.pemilik_grup_id,
+                status='TODO', progress=0, template_bau=tmpl, periode=p,
+            )
+            for code, (tmpl, p) in zip(codes, missing)
+        ], ignore_conflicts=True)  # occurrence yang keburu dibuat host lain dilewati oleh kunci unik
+        # ignore_conflicts tidak mengembalikan pk: isi materialized path (tugas utama) berbasis set
+        Tugas.objects.filter(kode_tugas__in=codes, jalur='').update(jalur=Concat(Cast('id', CharField()), Value('/')))
+
+        # Yang benar-benar masuk = kode hasil reservasi run ini (baris yang kalah balapan tidak tersimpan)
+        created = Tugas.objects.filter(kode_tugas__in=codes).count()
+        if created: log_activity(None, 'CREATE', 'Tugas', 'BAU-GENERATE', f"Generate BAU: {created} tugas ({start} s/d {end})")
+    if created: bump_generation()  # bulk_create tidak memicu post_save
+    return created
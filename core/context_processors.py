@@ -0,0 +1,7 @@
+from .access import get_primary_group
+
+def user_group(request):
+    # Nama divisi di navbar, diambil dari resolver (tanpa query tambahan jika sudah ter-cache)
+    if not request.user.is_authenticated: return {}
+    primary = get_primary_group(request.user)
+    return {'user_group_name': primary[1] if primary else None}
@@ -0,0 +1,155 @@
+from collections import deque
+from datetime import date, timedelta
+from .models import Tugas
+
+# --- DEPENDENCY GRAPH ENGINE ---
+# Graf dependensi (tergantung_pada -> tugas) dimuat dengan satu query values() per proyek,
+# lalu semua perhitungan jalan di memori dalam O(V+E): urutan topologis, earliest/latest
+# start, slack, critical path, dan geser jadwal berantai ke tugas turunan.
+# Durasi & slack dihitung dalam hari kerja (Sabtu/Minggu dilewati, sama seperti validasi form).
+
+NODE_FIELDS = ('id', 'tanggal_mulai', 'tenggat_waktu', 'tergantung_pada_id', 'versi')
+EPOCH = date(2000, 1, 3)  # Senin
+
+
+class CycleError(ValueError):
+    pass
+
+
+def workday_index(d):
+    # Nomor hari kerja sejak EPOCH; Sabtu/Minggu dibulatkan ke Senin berikutnya
+    days = (d - EPOCH).days
+    weeks, wd = divmod(days, 7)
+    return weeks * 5 + min(wd, 5)
+
+
+def workday_date(i):
+    weeks, wd = divmod(i, 5)
+    return EPOCH + timedelta(days=weeks * 7 + wd)
+
+
+class Graph:
+    def __init__(self, rows):
+        self.nodes = {r['id']: r for r in rows}
+        self.succ = {i: [] for i in self.nodes}
+        for r in rows:
+            dep = r['tergantung_pada_id']
+            if dep in self.nodes: self.succ[dep].append(r['id'])
+
+    def pred(self, node_id):
+        dep = self.nodes[node_id]['tergantung_pada_id']
+        return dep if dep in self.nodes else None
+
+    def topological_order(self):
+        """Kahn's algorithm; CycleError jika ada siklus."""
+        indegree = {i: (1 if self.pred(i) is not None else 0) for i in self.nodes}
+        queue = deque(sorted(i for i, n in indegree.items() if n == 0))
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for s in self.succ[i]:
+                indegree[s] -= 1
+                if not indegree[s]: queue.append(s)
+        if len(order) != len(self.nodes):
+            raise CycleError("Dependensi tugas membentuk siklus.")
+        return order
+
+    def duration(self, node_id):
+        n = self.nodes[node_id]
+        return max(1, workday_index(n['tenggat_waktu']) - workday_index(n['tanggal_mulai']) + 1)
+
+    def schedule(self):
+        """{id: {'es','ef','ls','lf','slack','critical'}}; es/ls berupa date, slack dalam hari kerja."""
+        order = self.topological_order()
+        es, ef = {}, {}
+        for i in order:
+            p = self.pred(i)
+            # Tidak lebih awal dari plan, dan tidak sebelum pendahulunya selesai
+            start = workday_index(self.nodes[i]['tanggal_mulai'])
+            es[i] = max(start, ef[p] + 1) if p is not None else start
+            ef[i] = es[i] + self.duration(i) - 1
+
+        finish = max(ef.values(), default=0)
+        ls, lf = {}, {}
+        for i in reversed(order):
+            lf[i] = min((ls[s] - 1 for s in self.succ[i]), default=finish)
+            ls[i] = lf[i] - self.duration(i) + 1
+
+        return {i: {
+            'es': workday_date(es[i]), 'ef': workday_date(ef[i]),
+            'ls': workday_date(ls[i]), 'lf': workday_date(lf[i]),
+            'slack': ls[i] - es[i], 'critical': ls[i] == es[i],
+        } for i in order}
+
+    def cascade(self, node_id):
+        """Geser maju turunan node_id yang bentrok; return {id: (mulai, tenggat)} yang berubah."""
+        changed, queue = {}, deque([node_id])
+        while queue:
+            i = queue.popleft()
+            end = workday_index(self.nodes[i]['tenggat_waktu'])
+            for s in self.succ[i]:
+                n = self.nodes[s]
+                if workday_index(n['tanggal_mulai']) > end: continue
+                dur = self.duration(s)
+                n['tanggal_mulai'], n['tenggat_waktu'] = workday_date(end + 1), workday_date(end + dur)
+                changed[s] = (n['tanggal_mulai'], n['tenggat_waktu'])
+                queue.append(s)
+        return changed
+
+
+def load_graph(task):
+    """Graf proyek milik `task` (satu query); tugas tanpa proyek: komponen turunannya per level."""
+    if task.proyek_id:
+        return Graph(list(Tugas.objects.filter(proyek_id=task.proyek_id).values(*NODE_FIELDS)))
+
+    rows = list(Tugas.objects.filter(pk=task.pk).values(*NODE_FIELDS))
+    frontier, seen = [task.pk], {task.pk}
+    while frontier:
+        level = [r for r in Tugas.objects.filter(tergantung_pada_id__in=frontier).values(*NODE_FIELDS) if r['id'] not in seen]
+        rows.extend(level)
+        seen.update(r['id'] for r in level)
+        frontier = [r['id'] for r in level]
+    return Graph(rows)
+
+
+def would_cycle(task, pred_id):
+    """True jika menjadikan pred_id pendahulu `task` membentuk siklus (task adalah leluhur pred_id)."""
+    if task.pk is None or pred_id is None: return False
+    graph = load_graph(task)
+    seen, cur = set(), pred_id
+    while cur is not None and cur not in seen:
+        if cur == task.pk: return True
+        seen.add(cur)
+        # Rantai bisa keluar dari proyek: lanjutkan dengan query per langkah
+        if cur in graph.nodes: cur = graph.nodes[cur]['tergantung_pada_id']
+        else: cur = Tugas.objects.filter(pk=cur).values_list('tergantung_pada_id', flat=True).first()
+    return False
+
+
+def reschedule(task):
+    """Geser jadwal turunan `task` (sudah disimpan) dengan satu bulk_update; return {id: (mulai, tenggat)}."""
+    return reschedule_many([task])
+
+
+def reschedule_many(tasks):
+    """reschedule() untuk banyak tugas: satu graf per proyek, satu bulk_update untuk semua perubahan."""
+    graphs, changed, versions = {}, {}, {}
+    for task in tasks:
+        key = task.proyek_id or f"tugas:{task.pk}"
+        if key not in graphs:
+            graph = load_graph(task)
+            try: graph.topological_order()
+            except CycleError: graph = None  # data lama yang sudah bersiklus: jangan geser apa pun
+            graphs[key] = graph
+        if graphs[key] is not None:
+            shifted = graphs[key].cascade(task.pk)
+            changed.update(shifted)
+            versions.update((i, graphs[key].nodes[i]['versi']) for i in shifted)
+    if changed:
+        # Versi ikut naik agar klien yang memegang jadwal lama mendapat konflik, bukan menimpa
+        Tugas.objects.bulk_update(
+            [Tugas(pk=i, tanggal_mulai=s, tenggat_waktu=e, versi=versions[i] + 1) for i, (s, e) in changed.items()],
+            ['tanggal_mulai', 'tenggat_waktu', 'versi'],
+        )
+    return changed
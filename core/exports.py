@@ -0,0 +1,220 @@
+import csv
+import itertools
+import json
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape, quoteattr
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel
+from .access import visible_tasks, visible_projects
+from .audit import audit_partitions
+from .filters import apply_task_filters, apply_project_filters
+from .readers import chunked
+
+# --- STREAMING EXPORT ---
+# XLSX ditulis langsung sebagai paket OOXML minimal (satu sheet, tiga style: default, header, tanggal);
+# isi sheet ditulis baris per baris ke zip yang di-stream langsung ke response.
+# Memori konstan berapa pun jumlah baris, dan download dimulai sebelum query selesai.
+
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BATCH_ROWS = 1000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+SHEET_PATH = 'xl/worksheets/sheet1.xml'
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+HEADER_STYLE, DATE_STYLE = 1, 2  # indeks cellXfs di STYLES_XML
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{REL_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{REL_NS}/styles" Target="styles.xml"/></Relationships>'
+    ),
+    'xl/styles.xml': (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><styleSheet xmlns="{MAIN_NS}">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font></fonts>'
+        '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+        '<fill><patternFill patternType="solid"><fgColor rgb="FF4F81BD"/><bgColor rgb="FF4F81BD"/></patternFill></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+
+class _ZipStream:
+    """File-like tanpa seek: zipfile menulis dengan data descriptor, kita ambil byte-nya tiap saat."""
+    def __init__(self):
+        self.chunks, self.pos = [], 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data)); self.pos += len(data)
+        return len(data)
+
+    def tell(self): return self.pos
+    def flush(self): pass
+
+    def drain(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def _workbook_xml(title):
+    # Nama sheet Excel maks. 31 karakter dan tanpa []:*?/\
+    name = ''.join(ch for ch in title if ch not in '[]:*?/\\')[:31] or 'Sheet1'
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+        f'<sheets><sheet name={quoteattr(name)} sheetId="1" r:id="rId1"/></sheets></workbook>'
+    )
+
+
+def _sheet_head(headers, widths):
+    cols = ''.join(f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>' for i, w in enumerate(widths or [], start=1))
+    header = ''.join(_cell_xml(f"{get_column_letter(i)}1", h, HEADER_STYLE) for i, h in enumerate(headers, start=1))
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><worksheet xmlns="{MAIN_NS}">'
+        + (f'<cols>{cols}</cols>' if cols else '') + f'<sheetData><row r="1">{header}</row>'
+    )
+
+
+def _cell_xml(ref, value, style=0):
+    if value is None or value == '': return ''
+    s = f' s="{style}"' if style else ''
+    if isinstance(value, bool): return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)): return f'<c r="{ref}"{s}><v>{value}</v></c>'
+    if isinstance(value, (date, datetime)): return f'<c r="{ref}" s="{DATE_STYLE}"><v>{to_excel(value)}</v></c>'
+    text = escape(ILLEGAL_CHARACTERS_RE.sub('', str(value)))
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(title, headers, rows, widths=None):
+    """Generator byte XLSX; `rows` boleh iterator lazy (mis. queryset.iterator())."""
+    out = _ZipStream()
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in XLSX_PARTS.items(): zf.writestr(name, xml)
+        zf.writestr('xl/workbook.xml', _workbook_xml(title))
+        yield out.drain()
+
+        with zf.open(SHEET_PATH, 'w', force_zip64=True) as f:
+            f.write(_sheet_head(headers, widths).encode('utf-8'))
+            letters = [get_column_letter(i) for i in range(1, len(headers) + 1)]
+            batch = []
+            for r, row in enumerate(rows, start=2):
+                cells = ''.join(_cell_xml(f"{letters[i]}{r}", v) for i, v in enumerate(row))
+                batch.append(f'<row r="{r}">{cells}</row>')
+                if len(batch) >= 500:
+                    f.write(''.join(batch).encode('utf-8')); batch = []
+                    yield out.drain()
+            f.write((''.join(batch) + '</sheetData></worksheet>').encode('utf-8'))
+    yield out.drain()
+
+
+# --- CSV / NDJSON EXPORT (Tugas, Proyek, Audit Log) ---
+# Baris dibaca lazy lewat iterator() (server-side cursor di PostgreSQL), jadi
+# ekstrak jutaan baris tidak pernah dimuat utuh ke memori Python.
+
+EXPORT_DATASETS = {
+    'tugas': [
+        ('id', 'id'), ('kode_tugas', 'kode_tugas'), ('nama_tugas', 'nama_tugas'), ('tipe_tugas', 'tipe_tugas'),
+        ('status', 'status'), ('progress', 'progress'), ('kode_proyek', 'proyek__kode_proyek'),
+        ('kode_induk', 'induk__kode_tugas'), ('tergantung_pada', 'tergantung_pada__kode_tugas'),
+        ('pic', 'ditugaskan_ke__username'), ('pemberi_tugas', 'pemberi_tugas'), ('grup', 'pemilik_grup__name'),
+        ('tanggal_mulai', 'tanggal_mulai'), ('tenggat_waktu', 'tenggat_waktu'),
+        ('tanggal_mulai_aktual', 'tanggal_mulai_aktual'), ('tanggal_selesai_aktual', 'tanggal_selesai_aktual'),
+    ],
+    'proyek': [
+        ('id', 'id'), ('kode_proyek', 'kode_proyek'), ('nama_proyek', 'nama_proyek'), ('status', 'status'),
+        ('grup', 'pemilik_grup__name'), ('dibuat_oleh', 'dibuat_oleh__username'),
+        ('tanggal_mulai', 'tanggal_mulai'), ('tanggal_selesai', 'tanggal_selesai'),
+        ('tanggal_mulai_aktual', 'tanggal_mulai_aktual'), ('tanggal_selesai_aktual', 'tanggal_selesai_aktual'),
+    ],
+    'audit': [
+        ('id', 'id'), ('timestamp', 'timestamp'), ('user', 'user__username'), ('action', 'action'),
+        ('target_model', 'target_model'), ('target_id', 'target_id'), ('details', 'details'),
+    ],
+}
+EXPORT_FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+
+def export_rows(dataset, user, params):
+    """(nama kolom, iterator tuple) untuk dataset yang sudah difilter visibilitas + parameter."""
+    columns = [c for c, _ in EXPORT_DATASETS[dataset]]
+    lookups = [l for _, l in EXPORT_DATASETS[dataset]]
+
+    if dataset == 'audit':
+        # Arsip + tabel aktif, hanya partisi yang beririsan dengan rentang tanggal
+        parts = audit_partitions(params)
+        return columns, itertools.chain.from_iterable(qs.order_by('id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE) for qs in parts)
+
+    if dataset == 'tugas': qs = apply_task_filters(visible_tasks(user), params)
+    else: qs = apply_project_filters(visible_projects(user), params)
+    return columns, qs.order_by('id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    def write(self, value): return value
+
+
+def _text(value):
+    if isinstance(value, (date, datetime)): return value.isoformat()
+    return value
+
+
+def _batched(lines, size=STREAM_BATCH_ROWS):
+    # Satu chunk per `size` baris: di ASGI tiap chunk = satu lompatan thread (sync_to_async)
+    for batch in chunked(lines, size):
+        yield ''.join(batch)
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    yield from _batched(writer.writerow([_text(v) for v in row]) for row in rows)
+
+
+def stream_ndjson(columns, rows):
+    yield from _batched(json.dumps(dict(zip(columns, (_text(v) for v in row))), ensure_ascii=False) + '\n' for row in rows)
+
+
+def stream_export(fmt, columns, rows):
+    return stream_ndjson(columns, rows) if fmt == 'ndjson' else stream_csv(columns, rows)
+
+
+# --- ASGI ---
+# Di ASGI, StreamingHttpResponse dengan iterator sync akan dikumpulkan utuh ke list sebelum dikirim.
+# Bungkus jadi async iterator: tiap chunk diambil lewat sync_to_async (thread request yang sama).
+_END = object()
+
+
+async def _aiterate(chunks):
+    it, step = iter(chunks), sync_to_async(next)
+    while (chunk := await step(it, _END)) is not _END:
+        yield chunk
+
+
+def streaming_body(request, chunks):
+    return _aiterate(chunks) if isinstance(request, ASGIRequest) else chunks
@@ -0,0 +1,75 @@
+from datetime import date, datetime, time, timedelta
+from django.utils import timezone
+
+# --- FILTER DAFTAR TUGAS ---
+# Dipakai bersama oleh TugasListView dan endpoint lain yang menerima filter yang sama.
+
+TASK_FILTER_KEYS = ('assignee', 'status', 'tipe', 'proyek', 'grup', 'due_from', 'due_to')
+
+
+def _parse_date(value):
+    try: return date.fromisoformat(value[:10]) if value else None
+    except ValueError: return None
+
+
+def _parse_int(value):
+    try: return int(value) if value else None
+    except ValueError: return None
+
+
+def apply_task_filters(qs, params):
+    assignee = _parse_int(params.get('assignee'))
+    if assignee: qs = qs.filter(ditugaskan_ke_id=assignee)
+
+    status = params.get('status')
+    if status: qs = qs.filter(status=status)
+
+    tipe = params.get('tipe')
+    if tipe: qs = qs.filter(tipe_tugas=tipe)
+
+    proyek = _parse_int(params.get('proyek'))
+    if proyek: qs = qs.filter(proyek_id=proyek)
+
+    grup = _parse_int(params.get('grup'))
+    if grup: qs = qs.filter(pemilik_grup_id=grup)
+
+    due_from, due_to = _parse_date(params.get('due_from')), _parse_date(params.get('due_to'))
+    if due_from: qs = qs.filter(tenggat_waktu__gte=due_from)
+    if due_to: qs = qs.filter(tenggat_waktu__lte=due_to)
+    return qs
+
+
+# --- FILTER EXPORT PROYEK & AUDIT LOG ---
+# Hanya filter yang memang punya kolom padanan: parameter daftar tugas yang tidak berlaku
+# (assignee/due di Proyek) diabaikan, bukan dipetakan ke kolom lain.
+# Audit Log memakai parameter sendiri: user, action, date_from, date_to.
+
+PROJECT_FILTER_KEYS = ('status', 'grup')
+AUDIT_FILTER_KEYS = ('user', 'action', 'date_from', 'date_to')
+
+
+def apply_project_filters(qs, params):
+    status = params.get('status')
+    if status: qs = qs.filter(status=status)
+
+    grup = _parse_int(params.get('grup'))
+    if grup: qs = qs.filter(pemilik_grup_id=grup)
+    return qs
+
+
+def audit_date_range(params):
+    return _parse_date(params.get('date_from')), _parse_date(params.get('date_to'))
+
+
+def apply_audit_filters(qs, params):
+    user = _parse_int(params.get('user'))
+    if user: qs = qs.filter(user_id=user)
+
+    action = params.get('action')
+    if action: qs = qs.filter(action=action)
+
+    # Rentang tanggal -> batas datetime agar index timestamp tetap terpakai
+    date_from, date_to = audit_date_range(params)
+    if date_from: qs = qs.filter(timestamp__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+    if date_to: qs = qs.filter(timestamp__lt=timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min)))
+    return qs
@@ -1,12 +1,13 @@
 from django import forms
 from django.contrib.auth.models import User, Group
 from .models import Proyek, Tugas, TemplateBAU
+from .access import get_accessible_group_ids
 
 class ImportTugasForm(forms.Form):
-    file_excel = forms.FileField(label="Upload File Excel Tugas (.xlsx)", widget=forms.FileInput(attrs={'class': 'form-control'}))
+    file_excel = forms.FileField(label="Upload File Tugas (.xlsx / .csv / .tsv)", widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.xlsx,.csv,.tsv,.txt'}))
 
 class ImportUserForm(forms.Form):
-    file_excel = forms.FileField(label="Upload File Excel User (.xlsx)", widget=forms.FileInput(attrs={'class': 'form-control'}))
+    file_excel = forms.FileField(label="Upload File User (.xlsx / .csv / .tsv)", widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.xlsx,.csv,.tsv,.txt'}))
 
 # --- FORM PROYEK ---
 class ProyekForm(forms.ModelForm):
@@ -77,21 +78,12 @@ class TugasForm(forms.ModelForm):
             # Hapus field pemilik grup untuk user biasa
             del self.fields['pemilik_grup']
             
-            user_groups = list(user.groups.all())
-            group_names = [g.name.upper() for g in user_groups]
             role = user.profile.role if hasattr(user, 'profile') else 'MEMBER'
-            
-            if 'RISK MANAGEMENT' in group_names and role == 'ADMIN':
-                sub_groups = Group.objects.filter(name__in=[
-                    'RISK PROCESS CONTROL', 'PORTFOLIO MANAGEMENT & GOVERNANCE', 'RISK PRODUCT & DEVELOPMENT'
-                ])
-                user_groups.extend(list(sub_groups))
-                
-            accessible_groups = Group.objects.filter(id__in=[g.id for g in user_groups]).distinct()
+            accessible_groups = get_accessible_group_ids(user)
 
-            self.fields['proyek'].queryset = Proyek.objects.filter(pemilik_grup__in=accessible_groups)
-            self.fields['induk'].queryset = Tugas.objects.filter(pemilik_grup__in=accessible_groups)
-            self.fields['tergantung_pada'].queryset = Tugas.objects.filter(pemilik_grup__in=accessible_groups)
+            self.fields['proyek'].queryset = Proyek.objects.filter(pemilik_grup_id__in=accessible_groups)
+            self.fields['induk'].queryset = Tugas.objects.filter(pemilik_grup_id__in=accessible_groups)
+            self.fields['tergantung_pada'].queryset = Tugas.objects.filter(pemilik_grup_id__in=accessible_groups)
             
             if role == 'MEMBER':
                 self.fields['ditugaskan_ke'].queryset = User.objects.filter(pk=user.pk)
@@ -0,0 +1,68 @@
+from .dag import Graph, CycleError
+from .models import Proyek
+
+# --- GANTT DATA BUILDER ---
+# Dua query values() (tugas & proyek) lalu dikelompokkan di memori,
+# jadi jumlah query konstan berapa pun banyaknya proyek/tugas.
+# Critical path tiap proyek dihitung dari baris yang sama (engine DAG, tanpa query tambahan).
+
+TASK_FIELDS = ('id', 'nama_tugas', 'tanggal_mulai', 'tenggat_waktu', 'progress', 'status', 'proyek_id', 'tergantung_pada_id', 'rollup_total', 'rollup_count', 'versi')
+PROJECT_FIELDS = ('id', 'nama_proyek', 'tanggal_mulai', 'tanggal_selesai', 'progress_total', 'progress_count')
+BAR_CLASS = {'DONE': 'bar-done', 'OVERDUE': 'bar-overdue', 'ON_HOLD': 'bar-hold'}
+
+
+def task_bar(t, visible_ids, critical=frozenset()):
+    dep = t['tergantung_pada_id']
+    classes = ' '.join(c for c in (BAR_CLASS.get(t['status'], ''), 'bar-critical' if t['id'] in critical else '') if c)
+    return {
+        'id': str(t['id']), 'name': t['nama_tugas'],
+        'start': str(t['tanggal_mulai']), 'end': str(t['tenggat_waktu']),
+        # Tugas induk menampilkan roll-up progress subtask-nya
+        'progress': round(t['rollup_total'] / t['rollup_count']) if t['rollup_count'] else t['progress'],
+        'dependencies': str(dep) if dep and dep in visible_ids else "",
+        'custom_class': classes,
+        'version': t['versi'],
+    }
+
+
+def project_bar(p):
+    progress = round(p['progress_total'] / p['progress_count']) if p['progress_count'] else 0
+    return {'id': f"P-{p['id']}", 'name': f"📁 {p['nama_proyek']}", 'start': str(p['tanggal_mulai']), 'end': str(p['tanggal_selesai']), 'progress': progress, 'custom_class': 'bar-project', 'read_only': True}
+
+
+def critical_ids(rows):
+    # Hanya rantai dependensi yang punya arti: tugas lepas (tanpa edge) tidak ditandai
+    graph = Graph(rows)
+    try: schedule = graph.schedule()
+    except CycleError: return set()
+    linked = {i for i, s in graph.succ.items() if s} | {i for i in graph.nodes if graph.pred(i) is not None}
+    return {i for i in linked if schedule[i]['critical']}
+
+
+def project_rows(rows):
+    ids = sorted({t['proyek_id'] for t in rows if t['proyek_id'] is not None})
+    return Proyek.objects.filter(id__in=ids).order_by('id').values(*PROJECT_FIELDS) if ids else Proyek.objects.none()
+
+
+def assemble(rows, projects):
+    visible_ids = {t['id'] for t in rows}
+
+    by_project, standalone = {}, []
+    for t in rows:
+        if t['proyek_id'] is None: standalone.append(t)
+        else: by_project.setdefault(t['proyek_id'], []).append(t)
+
+    gantt_list = []
+    for p in projects:
+        gantt_list.append(project_bar(p))
+        critical = critical_ids(by_project[p['id']])
+        gantt_list.extend(task_bar(t, visible_ids, critical) for t in by_project[p['id']])
+
+    gantt_list.extend(task_bar(t, visible_ids) for t in standalone)
+    return gantt_list
+
+
+async def abuild_gantt_data(tasks):
+    # Async ORM untuk endpoint ASGI: satu query tugas + satu query proyek
+    rows = [t async for t in tasks.order_by('id').values(*TASK_FIELDS)]
+    return assemble(rows, [p async for p in project_rows(rows)])
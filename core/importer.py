@@ -0,0 +1,300 @@
+from datetime import datetime, date
+from django.contrib.auth.models import User, Group
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Q
+from .models import Proyek, Tugas, UserProfile, assign_paths, rollup_added
+from .audit import audited_atomic, log_activity
+from .readers import chunked, CHUNK_SIZE
+from .stats import bump_generation
+
+# --- BULK IMPORT ENGINE (TUGAS) ---
+# Alur per batch:
+#   1. Resolve proyek, PIC, dan induk dengan satu query IN masing-masing
+#   2. Alokasi kode tugas untuk seluruh batch di depan
+#   3. bulk_create Level 1, lalu Level 2
+# Error validasi tetap dilaporkan per baris. Untuk file besar gunakan import_stream()
+# agar baris diproses per chunk berukuran tetap.
+
+MAX_STORED_ERRORS = 100
+
+
+def parse_date(d):
+    if isinstance(d, datetime): return d.date()
+    if isinstance(d, date): return d
+    if isinstance(d, str):
+        for f in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+            try: return datetime.strptime(d.strip(), f).date()
+            except ValueError: pass
+    return None
+
+
+def parse_row(idx, row):
+    """Mapping satu baris sheet (tuple) ke dict; None jika baris kosong."""
+    if not row or not row[0]: return None
+    return {
+        'idx': idx,
+        'nama': row[0],
+        'tipe': (row[1] or 'ADHOC').upper().strip(),
+        'kode_p': row[2] if len(row) > 2 else None,
+        'pemberi': row[3] if len(row) > 3 else None,
+        'pic_uname': row[4] if len(row) > 4 else None,
+        'start': row[5] if len(row) > 5 else None,
+        'end': row[6] if len(row) > 6 else None,
+        'desc': (row[7] if len(row) > 7 else None) or "",
+        'level': int(row[8]) if len(row) > 8 and row[8] else 1,
+        'parent_name': str(row[9]).strip() if len(row) > 9 and row[9] else None,
+    }
+
+
+class ErrorTally:
+    """Jumlah error + MAX_STORED_ERRORS pesan pertama saja (memori tidak tumbuh dengan ukuran file)."""
+
+    def __init__(self):
+        self.error_count, self.errors = 0, []
+
+    def add_error(self, msg):
+        self.error_count += 1
+        if len(self.errors) < MAX_STORED_ERRORS: self.errors.append(msg)
+
+
+class TaskImporter(ErrorTally):
+    def __init__(self, user, group_id, progress=None):
+        super().__init__()
+        self.user = user
+        self.group_id = group_id
+        self.default_pemberi = user.get_full_name()
+        self.success_count = 0
+        # id tugas pertama yang dibuat import ini: induk dicari di DB, baris import ini menang
+        self.first_id = None
+        # callback(importer) setelah tiap chunk, dipakai job queue untuk progress bar
+        self.progress = progress
+
+    @property
+    def rows_done(self): return self.success_count + self.error_count
+
+    def error(self, row, msg):
+        self.add_error(f"Baris {row['idx']} ({row['nama']}): {msg}")
+
+    def import_stream(self, raw_rows, chunk_size=CHUNK_SIZE):
+        """Import dari iterator (idx, tuple) per chunk; memori tetap datar berapa pun ukuran file."""
+        # Buffer ringkas (idx, tuple mentah) untuk subtask yang induknya belum terlihat
+        deferred = []
+        for chunk in chunked(raw_rows, chunk_size):
+            rows = self._parse_chunk(chunk)
+            level1 = {r['nama'] for r in rows if r['level'] != 2}
+            outside = {r['parent_name'] for r in rows if r['level'] == 2 and r['parent_name'] and r['parent_name'] not in level1}
+            created = self._created_names(outside)
+            ready = []
+            for r in rows:
+                if r['level'] == 2 and r['parent_name'] in outside and r['parent_name'] not in created:
+                    deferred.append((r['idx'], r['raw']))
+                else:
+                    ready.append(r)
+            self.import_rows(ready)
+            if self.progress: self.progress(self)
+
+        # Semua Level 1 sudah masuk: induk kini bisa dicari di database
+        for chunk in chunked(deferred, chunk_size):
+            self.import_rows(self._parse_chunk(chunk))
+            if self.progress: self.progress(self)
+
+    def _parse_chunk(self, chunk):
+        rows = []
+        for idx, raw in chunk:
+            try: item = parse_row(idx, raw)
+            except Exception as e:
+                self.add_error(f"Baris {idx} ({raw[0]}): {str(e)}")
+                continue
+            if item:
+                item['raw'] = raw
+                rows.append(item)
+        return rows
+
+    def import_rows(self, rows):
+        """Proses satu batch baris (Level 1 dulu, baru Level 2) dalam satu transaksi."""
+        rows = sorted(rows, key=lambda r: r['level'])
+        if not rows: return
+
+        projects = {p.kode_proyek: p for p in Proyek.objects.filter(kode_proyek__in={r['kode_p'] for r in rows if r['kode_p']}).only('id', 'kode_proyek', 'pemilik_grup_id')}
+        users = dict(User.objects.filter(username__in={r['pic_uname'] for r in rows if r['pic_uname']}).values_list('username', 'id'))
+
+        with audited_atomic():
+            level1 = [(r, self._build(r, projects, users, None)) for r in rows if r['level'] != 2]
+            self._insert([(r, t) for r, t in level1 if t], top_level=True)
+
+            # Setelah Level 1 batch ini masuk: satu query untuk induk dari batch ini maupun sebelumnya
+            parents = self._load_parents({r['parent_name'] for r in rows if r['level'] == 2 and r['parent_name']})
+            level2 = []
+            for r in rows:
+                if r['level'] != 2: continue
+                if not r['parent_name']:
+                    self.error(r, "Level 2 (Subtask) wajib mengisi 'Nama Tugas Induk'")
+                    continue
+                parent = parents.get(r['parent_name'])
+                if not parent:
+                    self.error(r, f"Tugas Induk '{r['parent_name']}' tidak ditemukan.")
+                    continue
+                level2.append((r, self._build(r, projects, users, parent)))
+            self._insert([(r, t) for r, t in level2 if t], top_level=False)
+
+        bump_generation()  # bulk_create tidak memicu post_save
+
+    def _created_names(self, names):
+        # Nama yang sudah dibuat import ini (range pk, tidak menyentuh data lama)
+        if not names or self.first_id is None: return set()
+        return set(Tugas.objects.filter(pk__gte=self.first_id, nama_tugas__in=names).values_list('nama_tugas', flat=True))
+
+    def _load_parents(self, names):
+        if not names: return {}
+        qs = Tugas.objects.filter(nama_tugas__in=names)
+        if not self.user.is_superuser:
+            own_group = Q(pemilik_grup_id=self.group_id)
+            qs = qs.filter(own_group | Q(pk__gte=self.first_id) if self.first_id else own_group)
+        parents = {}
+        # Tugas terakhir yang dibuat import ini; jika tidak ada, sama seperti .first() (id terkecil)
+        for p in qs.order_by('id').values('id', 'nama_tugas', 'kode_tugas', 'tipe_tugas', 'proyek_id', 'jalur'):
+            if p['nama_tugas'] not in parents or (self.first_id and p['id'] >= self.first_id): parents[p['nama_tugas']] = p
+        return parents
+
+    def _build(self, r, projects, users, parent):
+        try:
+            start, end = parse_date(r['start']), parse_date(r['end'])
+            if not start or not end: raise ValueError("Format tanggal salah")
+            if start.weekday() >= 5: raise ValueError("Tanggal Mulai hari libur (Sabtu/Minggu)")
+
+            proyek = None
+            if r['tipe'] == 'PROJECT':
+                if not r['kode_p']: raise ValueError("Kode Proyek wajib diisi utk tipe PROJECT")
+                proyek = projects.get(r['kode_p'])
+                if not proyek: raise ValueError(f"Proyek {r['kode_p']} tidak ditemukan")
+
+            group_id = self.group_id or (proyek.pemilik_grup_id if proyek else None)
+            if not group_id: raise ValueError("Divisi/Group tugas tidak dapat ditentukan")
+
+            task = Tugas(
+                nama_tugas=r['nama'],
+                tipe_tugas=r['tipe'],
+                proyek_id=proyek.id if proyek else None,
+                pemberi_tugas=r['pemberi'] or self.default_pemberi,
+                ditugaskan_ke_id=users.get(r['pic_uname']),
+                tanggal_mulai=start,
+                tenggat_waktu=end,
+                pemilik_grup_id=group_id,
+                status='TODO',
+                progress=0,
+            )
+            if parent:
+                # Sama seperti Tugas.save(): subtask mewarisi tipe & proyek dari induk
+                task.induk_id = parent['id']
+                task.tipe_tugas = parent['tipe_tugas']
+                task.proyek_id = parent['proyek_id']
+                task._parent_kode = parent['kode_tugas']
+                task._parent_jalur = parent['jalur']
+            return task
+        except Exception as e:
+            self.error(r, str(e))
+            return None
+
+    def _insert(self, pairs, top_level):
+        if not pairs: return
+        self._allocate_codes([t for _, t in pairs], top_level)
+        try:
+            with transaction.atomic():
+                Tugas.objects.bulk_create([t for _, t in pairs])
+        except (IntegrityError, DataError):
+            # Satu baris gagal membatalkan seluruh batch: ulangi per baris (savepoint) agar error tepat barisnya
+            pairs = self._insert_rows(pairs)
+            if not pairs: return
+        tasks = [t for _, t in pairs]
+        assign_paths(tasks)
+        rollup_added(tasks)
+        if self.first_id is None: self.first_id = min(t.pk for t in tasks)
+
+        for r, t in pairs:
+            log_activity(self.user, 'CREATE', 'Tugas', t.kode_tugas, f"Import: {t.nama_tugas}")
+        self.success_count += len(tasks)
+
+    def _insert_rows(self, pairs):
+        ok = []
+        for r, t in pairs:
+            t.pk, t._state.adding = None, True
+            try:
+                with transaction.atomic():
+                    Tugas.objects.bulk_create([t])
+                ok.append((r, t))
+            except (IntegrityError, DataError) as e:
+                self.error(r, f"Gagal disimpan: {e}")
+        return ok
+
+    def _allocate_codes(self, tasks, top_level):
+        # Satu reservasi blok per sequence (atomik, aman untuk import paralel)
+        if top_level:
+            first = Tugas.reserve_codes(None, len(tasks))
+            for i, t in enumerate(tasks):
+                t.kode_tugas = f"T-{first + i:03d}"
+            return
+
+        by_parent = {}
+        for t in tasks: by_parent.setdefault(t.induk_id, []).append(t)
+        for induk_id, subtasks in by_parent.items():
+            first = Tugas.reserve_codes(induk_id, len(subtasks))
+            for i, t in enumerate(subtasks):
+                t.kode_tugas = f"{t._parent_kode}.{first + i}"
+
+
+# --- IMPORT USER ---
+class UserImporter(ErrorTally):
+    def __init__(self, progress=None, actor=None):
+        super().__init__()
+        self.actor = actor  # user yang menjalankan import (untuk audit log)
+        self.success_count = 0
+        self.groups = {}  # cache nama grup -> Group selama import
+        self.progress = progress
+
+    @property
+    def rows_done(self): return self.success_count + self.error_count
+
+    def import_stream(self, raw_rows, chunk_size=CHUNK_SIZE):
+        # Cek username yang sudah ada sekali per chunk
+        for chunk in chunked(raw_rows, chunk_size):
+            chunk = [(idx, row) for idx, row in chunk if row and row[0]]
+            existing = set(User.objects.filter(username__in=[str(row[0]).strip().lower().replace(" ", "") for _, row in chunk]).values_list('username', flat=True))
+            # Satu transaksi per chunk (audit log chunk ditulis sekali), savepoint per baris
+            with audited_atomic():
+                for idx, row in chunk:
+                    try:
+                        with transaction.atomic():
+                            uname = self._create_user(row, existing)
+                    except Exception as e:
+                        self.add_error(f"Baris {idx} ({row[0]}): {str(e)}")
+                        continue
+                    log_activity(self.actor, 'CREATE', 'User', uname, f"Import: {uname}")
+            if self.progress: self.progress(self)
+
+    def _create_user(self, row, existing):
+        uname = str(row[0]).strip().lower().replace(" ", "")
+        email, pwd = row[1], str(row[2]) if row[2] else "Default123"
+        fname, lname = row[3] or "", row[4] or ""
+        role, group_name = (str(row[5]).upper().strip() if row[5] else 'MEMBER'), str(row[6]).strip() if row[6] else None
+        
+        status_staf = str(row[7]).upper().strip() if len(row) > 7 and row[7] else 'ACTIVE'
+        is_active_user = False if status_staf in ['INACTIVE', 'NONAKTIF', '0', 'FALSE'] else True
+
+        if uname in existing: raise ValueError(f"Username {uname} sudah ada")
+        
+        u = User.objects.create_user(username=uname, email=email, password=pwd)
+        u.first_name = fname; u.last_name = lname
+        u.is_active = is_active_user 
+        u.is_staff = True 
+        u.save()
+        
+        UserProfile.objects.filter(user=u).update(role=role)
+        
+        if group_name:
+            if group_name not in self.groups:
+                self.groups[group_name], _ = Group.objects.get_or_create(name=group_name)
+            u.groups.add(self.groups[group_name])
+        
+        existing.add(uname)
+        self.success_count += 1
+        return uname
@@ -0,0 +1,132 @@
+import os
+import socket
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from django.core.files import File
+from django.db import transaction, connection
+from django.db.models import Q
+from django.utils import timezone
+from .importer import TaskImporter, UserImporter
+from .models import BackgroundJob, JobUploadChunk
+from .readers import iter_upload_rows, count_upload_rows
+
+# --- BACKGROUND JOB QUEUE (berbasis database) ---
+# View hanya enqueue lalu langsung kembali; `manage.py run_jobs` mengklaim job PENDING
+# dengan row locking (SELECT ... FOR UPDATE SKIP LOCKED di PostgreSQL) lalu menjalankannya.
+# Job RUNNING yang heartbeat-nya basi (worker crash) dipulihkan saat klaim berikutnya.
+# File upload ikut disimpan di DB per potongan, jadi web dan worker tidak perlu berbagi filesystem.
+
+JOB_LEASE_SECONDS = 600
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(kind, user, uploaded=None, params=None):
+    # Satu transaksi: worker tidak bisa mengklaim job sebelum seluruh potongan file tersimpan
+    with transaction.atomic():
+        job = BackgroundJob.objects.create(kind=kind, user=user, params=params or {}, file_name=uploaded.name if uploaded else '')
+        if uploaded: store_upload(job, uploaded)
+    return job
+
+
+def store_upload(job, uploaded):
+    # Disalin per potongan; isi file tidak pernah utuh di memori maupun dalam satu kolom
+    for seq, data in enumerate(uploaded.chunks(UPLOAD_CHUNK_BYTES)):
+        JobUploadChunk.objects.create(job=job, seq=seq, data=data)
+
+
+def discard_upload(job):
+    JobUploadChunk.objects.filter(job=job).delete()
+
+
+def recover_stale(now=None):
+    """Job RUNNING tanpa heartbeat selama lease: worker-nya mati.
+
+    Import tidak idempoten, jadi hanya job yang belum meng-commit satu chunk pun yang diantrekan
+    ulang; sisanya ditandai FAILED (baris yang sudah masuk tetap ada).
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=JOB_LEASE_SECONDS)
+    stale = BackgroundJob.objects.filter(Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff), status='RUNNING')
+    stale.filter(rows_done=0).update(status='PENDING', worker='', started_at=None, heartbeat_at=None)
+    for job in stale.exclude(rows_done=0):
+        if BackgroundJob.objects.filter(pk=job.pk, status='RUNNING').update(status='FAILED', finished_at=timezone.now(), result_message=f"Worker {job.worker} berhenti di tengah proses ({job.rows_done} baris sudah diproses)."):
+            discard_upload(job)
+
+
+def claim_next(worker=None):
+    """Klaim satu job PENDING tertua; None jika antrian kosong atau kalah cepat dengan worker lain."""
+    recover_stale()
+    with transaction.atomic():
+        qs = BackgroundJob.objects.filter(status='PENDING').order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        job_id = qs.values_list('id', flat=True).first()
+        if job_id is None: return None
+        # UPDATE bersyarat tetap menjaga klaim atomik di backend tanpa row lock (SQLite)
+        claimed = BackgroundJob.objects.filter(pk=job_id, status='PENDING').update(status='RUNNING', worker=worker or worker_name(), started_at=timezone.now(), heartbeat_at=timezone.now())
+    return BackgroundJob.objects.get(pk=job_id) if claimed else None
+
+
+def report_progress(job, importer):
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        rows_done=importer.rows_done, error_count=importer.error_count, errors=importer.errors,
+        heartbeat_at=timezone.now(),
+    )
+
+
+@contextmanager
+def job_file(job):
+    """Susun ulang upload ke file sementara lokal worker (openpyxl butuh file yang bisa di-seek)."""
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(job.file_name)[1]) as tmp:
+        for data in job.chunks.order_by('seq').values_list('data', flat=True).iterator(chunk_size=4):
+            tmp.write(data)
+        tmp.seek(0)
+        yield File(tmp, name=job.file_name)
+
+
+def run_import_tugas(job, upload):
+    importer = TaskImporter(job.user, job.params.get('group_id'), progress=lambda imp: report_progress(job, imp))
+    importer.import_stream(iter_upload_rows(upload))
+    return importer, f"Sukses import {importer.success_count} tugas."
+
+
+def run_import_user(job, upload):
+    importer = UserImporter(progress=lambda imp: report_progress(job, imp), actor=job.user)
+    importer.import_stream(iter_upload_rows(upload))
+    return importer, f"Sukses buat {importer.success_count} user."
+
+
+HANDLERS = {
+    'IMPORT_TUGAS': run_import_tugas,
+    'IMPORT_USER': run_import_user,
+}
+
+
+def run_job(job):
+    try:
+        with job_file(job) as upload:
+            BackgroundJob.objects.filter(pk=job.pk).update(total_rows=count_upload_rows(upload), heartbeat_at=timezone.now())
+            # Audit log per baris import ditulis sekali per chunk, di transaksi chunk itu
+            importer, message = HANDLERS[job.kind](job, upload)
+        report_progress(job, importer)
+        BackgroundJob.objects.filter(pk=job.pk).update(status='DONE', result_message=message, finished_at=timezone.now())
+    except Exception as e:
+        BackgroundJob.objects.filter(pk=job.pk).update(status='FAILED', result_message=f"File Error: {str(e)}", finished_at=timezone.now())
+    discard_upload(job)  # Selesai atau gagal, upload tidak dipakai lagi
+    job.refresh_from_db()
+    return job
+
+
+def job_payload(job):
+    percent = None
+    if job.status == 'DONE': percent = 100
+    elif job.total_rows: percent = min(99, int(job.rows_done * 100 / job.total_rows))
+    return {
+        'id': job.pk, 'kind': job.kind, 'status': job.status, 'status_display': job.get_status_display(),
+        'total_rows': job.total_rows, 'rows_done': job.rows_done, 'percent': percent,
+        'error_count': job.error_count, 'errors': job.errors[:5], 'message': job.result_message,
+    }
@@ -0,0 +1,62 @@
+import gzip
+import os
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.audit import retention_cutoff, retention_months, month_start
+from core.exports import EXPORT_DATASETS, stream_ndjson
+from core.models import AuditLog, AuditLogArchive
+
+ARCHIVE_FIELDS = ('id', 'user_id', 'action', 'target_model', 'target_id', 'details', 'timestamp')
+
+
+class Command(BaseCommand):
+    help = 'Pindahkan Audit Log yang lebih tua dari masa retensi ke tabel arsip (atau file gzip NDJSON per bulan)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=None, help='Jumlah bulan yang tetap di tabel aktif (default: AUDIT_RETENTION_MONTHS)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--to-dir', help='Tulis ke file audit-YYYY-MM.ndjson.gz di folder ini, bukan ke tabel arsip')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        months = retention_months() if options['months'] is None else options['months']
+        cutoff = retention_cutoff(months)
+        old = AuditLog.objects.filter(timestamp__lt=cutoff)
+        self.stdout.write(f"Batas retensi: {cutoff:%Y-%m-%d} ({months} bulan).")
+
+        if options['dry_run']:
+            self.stdout.write(f"[dry-run] {old.count()} baris akan diarsip.")
+            return
+        if options['to_dir']: os.makedirs(options['to_dir'], exist_ok=True)
+
+        moved = 0
+        while True:
+            ids = list(old.order_by('id').values_list('id', flat=True)[:options['chunk_size']])
+            if not ids: break
+            batch = AuditLog.objects.filter(id__in=ids).order_by('id')
+            # File ditulis sebelum baris dihapus: jika gagal di tengah, data tidak hilang
+            if options['to_dir']: self.write_files(options['to_dir'], batch)
+            with transaction.atomic():
+                if not options['to_dir']:
+                    AuditLogArchive.objects.bulk_create([
+                        AuditLogArchive(bulan=month_start(row['timestamp']), **{k: v for k, v in row.items() if k != 'id'})
+                        for row in batch.values(*ARCHIVE_FIELDS)
+                    ])
+                AuditLog.objects.filter(id__in=ids).delete()  # fast delete: satu DELETE ... IN
+            moved += len(ids)
+            self.stdout.write(f"  {moved} baris dipindah...")
+
+        target = options['to_dir'] or 'tabel arsip'
+        self.stdout.write(self.style.SUCCESS(f"Selesai! {moved} baris Audit Log dipindah ke {target}."))
+
+    def write_files(self, folder, batch):
+        columns = [c for c, _ in EXPORT_DATASETS['audit']]
+        lookups = [l for _, l in EXPORT_DATASETS['audit']]
+        ts = lookups.index('timestamp')
+        by_month = {}
+        for row in batch.values_list(*lookups):
+            by_month.setdefault(month_start(row[ts]), []).append(row)
+        # Mode append gzip = multi-member, tetap bisa dibaca zcat / gzip.open
+        for bulan, rows in by_month.items():
+            with gzip.open(os.path.join(folder, f"audit-{bulan:%Y-%m}.ndjson.gz"), 'at', encoding='utf-8') as f:
+                f.writelines(stream_ndjson(columns, rows))
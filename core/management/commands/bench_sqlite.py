@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from core.sqlite import apply_pragmas, sqlite_pragmas, sqlite_timeout
+
+# Beban tiap transaksi meniru request tulis aplikasi: baca dulu, lalu INSERT, lalu COMMIT.
+# Profil 'default' = SQLite bawaan Django (rollback journal, BEGIN deferred, timeout 5 detik);
+# profil 'tuned' = settings.SQLITE_PRAGMAS + BEGIN IMMEDIATE (timeout = settings.SQLITE_TIMEOUT).
+# Dijalankan di file sementara, tidak menyentuh database aplikasi.
+
+SCHEMA = 'CREATE TABLE bench (id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT, created REAL); CREATE INDEX bench_worker ON bench (worker);'
+PROFILES = {
+    'default': {'begin': 'BEGIN', 'timeout': 5, 'pragmas': {}},
+    'tuned': {'begin': 'BEGIN IMMEDIATE', 'timeout': None, 'pragmas': None},  # None -> settings (SQLITE_TIMEOUT, SQLITE_PRAGMAS)
+}
+
+
+def _writer(path, profile, worker, seconds, start, results):
+    conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None)
+    apply_pragmas(conn, profile['pragmas'])
+    commits = errors = 0
+    payload = 'x' * 200
+    start.wait()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            conn.execute(profile['begin'])
+            conn.execute('SELECT COUNT(*) FROM bench WHERE worker = ?', (worker,)).fetchone()
+            conn.execute('INSERT INTO bench (worker, payload, created) VALUES (?, ?, ?)', (worker, payload, time.time()))
+            conn.execute('COMMIT')
+            commits += 1
+        except sqlite3.OperationalError:  # "database is locked"
+            if conn.in_transaction: conn.execute('ROLLBACK')
+            errors += 1
+    conn.close()
+    results.put((commits, errors))
+
+
+def run_bench(profile, writers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite3')
+        conn = sqlite3.connect(path)
+        apply_pragmas(conn, profile['pragmas'])  # journal_mode=WAL tersimpan di file
+        conn.executescript(SCHEMA); conn.close()
+
+        start, results = multiprocessing.Event(), multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_writer, args=(path, profile, i, seconds, start, results)) for i in range(writers)]
+        for p in procs: p.start()
+        start.set()
+        totals = [results.get() for _ in procs]
+        for p in procs: p.join()
+    return sum(c for c, _ in totals), sum(e for _, e in totals)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark konkurensi tulis SQLite: throughput commit/detik dengan N proses writer (default vs tuned)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', default='1,2,4,8', help='Daftar jumlah proses writer, dipisah koma')
+        parser.add_argument('--seconds', type=float, default=3.0, help='Durasi tiap run')
+        parser.add_argument('--profile', choices=['default', 'tuned', 'both'], default='both')
+
+    def handle(self, *args, **options):
+        names = ['default', 'tuned'] if options['profile'] == 'both' else [options['profile']]
+        seconds = options['seconds']
+        self.stdout.write(f"{'profil':<8} {'writer':>6} {'commit/s':>10} {'locked':>8}")
+        for name in names:
+            profile = dict(PROFILES[name])
+            if profile['timeout'] is None: profile['timeout'] = sqlite_timeout()
+            if profile['pragmas'] is None: profile['pragmas'] = sqlite_pragmas()
+            for writers in [int(w) for w in options['writers'].split(',') if w.strip()]:
+                commits, errors = run_bench(profile, writers, seconds)
+                self.stdout.write(f"{name:<8} {writers:>6} {commits / seconds:>10.0f} {errors:>8}")
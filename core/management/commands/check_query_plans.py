@@ -0,0 +1,109 @@
+import io
+import re
+from datetime import date
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from core.models import Proyek, Tugas, TemplateBAU, AuditLog
+from core import views
+from core.audit import audit_partitions
+
+# Full table scan pada tabel aplikasi (SCAN tanpa USING INDEX) dianggap regresi
+FULL_SCAN = re.compile(r'\bSCAN (core_\w+)\b(?! USING)')
+# Scan yang memang disengaja (mis. generate_bau memproses SEMUA template)
+ALLOWED_SCANS = {'generate-bau': {'core_templatebau'}}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Cek EXPLAIN query hot path (dashboard, daftar tugas, Gantt, kalender, BAU); gagal jika ada full table scan (SQLite)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Tampilkan semua plan, bukan hanya yang bermasalah')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING(f"Backend {connection.vendor}: cek plan hanya dijalankan di SQLite."))
+            return
+
+        # Data contoh dibuat dalam transaksi yang selalu di-rollback
+        captured = {}
+        try:
+            with transaction.atomic():
+                self.capture(captured)
+                raise Rollback()
+        except Rollback:
+            pass
+
+        failures = []
+        for scenario, queries in captured.items():
+            for sql in queries:
+                plan = self.explain(sql)
+                scans = set(FULL_SCAN.findall(plan)) - ALLOWED_SCANS.get(scenario, set())
+                if scans: failures.append((scenario, sql, plan))
+                if scans or options['verbose_plans']:
+                    self.stdout.write(f"[{scenario}] {sql[:160]}\n    {plan}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} query jatuh ke full table scan: " + ", ".join(sorted({f[0] for f in failures})))
+        self.stdout.write(self.style.SUCCESS(f"OK: {sum(len(q) for q in captured.values())} query diperiksa, tidak ada full table scan."))
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def capture(self, captured):
+        g1 = Group.objects.create(name='__plan_check_a__')
+        g2 = Group.objects.create(name='__plan_check_b__')
+        user = User.objects.create_user('__plan_check__', password=None)
+        user.groups.add(g1)
+        p = Proyek.objects.create(nama_proyek='plan', tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=g1)
+        task = Tugas.objects.create(nama_tugas='plan', proyek=p, tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=g2, ditugaskan_ke=user)
+        TemplateBAU.objects.create(nama_tugas='plan', frekuensi='MONTHLY', pemilik_grup=g1)
+        user = User.objects.get(pk=user.pk)
+
+        rf = RequestFactory()
+        scenarios = {
+            'dashboard': (views.dashboard, '/'),
+            'tugas-list': (views.TugasListView.as_view(), '/tugas/?status=TODO'),
+            'tugas-list-due': (views.TugasListView.as_view(), '/tugas/?due_from=2025-02-01&due_to=2025-02-28'),
+            'gantt': (views.gantt_data, '/gantt-data/'),
+            'calendar': (views.calendar_data, '/calendar-data/?start=2025-02-01&end=2025-03-01'),
+        }
+        for name, (view, url) in scenarios.items():
+            request = rf.get(url)
+            request.user = user
+            request.auser = sync_to_async(lambda: user)
+            # View async (gantt, kalender) dijalankan lewat async_to_sync: query tetap di thread ini
+            if iscoroutinefunction(view): view = async_to_sync(view)
+            with CaptureQueriesContext(connection) as ctx:
+                response = view(request)
+                if hasattr(response, 'render'): response.render()
+            captured[name] = self.app_selects(ctx)
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('generate_bau', stdout=io.StringIO())
+        captured['generate-bau'] = self.app_selects(ctx)
+
+        with CaptureQueriesContext(connection) as ctx:
+            list(AuditLog.objects.filter(target_model='Tugas', target_id='T-001').order_by('-timestamp')[:50])
+        captured['audit-history'] = self.app_selects(ctx)
+
+        with CaptureQueriesContext(connection) as ctx:
+            for qs in audit_partitions({'date_from': '2025-01-01', 'date_to': '2025-01-31'}): list(qs[:50])
+        captured['audit-range'] = self.app_selects(ctx)
+
+        with CaptureQueriesContext(connection) as ctx:
+            list(task.descendants()); task.ancestors()
+        captured['subtree'] = self.app_selects(ctx)
+
+    def app_selects(self, ctx):
+        return [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and '"core_' in q['sql']]
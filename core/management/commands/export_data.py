@@ -0,0 +1,46 @@
+import sys
+from django.core.management.base import BaseCommand
+from core.exports import EXPORT_DATASETS, EXPORT_FORMATS, export_rows, stream_export
+from core.filters import TASK_FILTER_KEYS, PROJECT_FILTER_KEYS, AUDIT_FILTER_KEYS
+
+class Command(BaseCommand):
+    help = 'Export streaming Tugas/Proyek/Audit Log ke CSV atau NDJSON (untuk BI warehouse)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORT_DATASETS))
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='File tujuan (default: stdout)')
+        # Filter tugas sama dengan daftar tugas; proyek hanya --status/--grup
+        parser.add_argument('--assignee', help='tugas')
+        parser.add_argument('--status', help='tugas, proyek')
+        parser.add_argument('--tipe', help='tugas')
+        parser.add_argument('--proyek', help='tugas')
+        parser.add_argument('--grup', help='tugas, proyek')
+        parser.add_argument('--due-from', dest='due_from', help='tugas')
+        parser.add_argument('--due-to', dest='due_to', help='tugas')
+        # Filter audit log
+        parser.add_argument('--user', help='audit: ID user')
+        parser.add_argument('--action', help='audit: CREATE/UPDATE/DELETE')
+        parser.add_argument('--date-from', dest='date_from', help='audit')
+        parser.add_argument('--date-to', dest='date_to', help='audit')
+
+    def handle(self, *args, **options):
+        keys = {'tugas': TASK_FILTER_KEYS, 'proyek': PROJECT_FILTER_KEYS, 'audit': AUDIT_FILTER_KEYS}[options['dataset']]
+        params = {k: options[k] for k in keys if options[k]}
+        columns, rows = export_rows(options['dataset'], None, params)
+        # Chunk berisi banyak baris; hitung di iterator baris
+        count = 0
+        def counted():
+            nonlocal count
+            for row in rows:
+                count += 1; yield row
+
+        out = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in stream_export(options['format'], columns, counted()):
+                out.write(chunk)
+        finally:
+            if options['output']: out.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"Selesai! {count} baris {options['dataset']} ditulis ke {options['output']}."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Proyek, Tugas, compute_rollup
+from core.stats import bump_generation
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang roll-up progress semua tugas induk & proyek (perbaikan jika agregat bergeser)'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Hitung dan tulis di transaksi yang sama; baris dikunci (PostgreSQL) agar delta
+            # dari penulis lain tidak jatuh di antara hitung ulang dan bulk_update
+            task_totals, project_totals = compute_rollup(Tugas.objects.select_for_update())
+            fixed = 0
+            for model, totals, fields in ((Tugas, task_totals, ('rollup_total', 'rollup_count')), (Proyek, project_totals, ('progress_total', 'progress_count'))):
+                # Hanya baris yang nilainya berbeda yang ditulis ulang
+                stale = []
+                for pk, total, count in model.objects.select_for_update().values_list('id', *fields).iterator(chunk_size=2000):
+                    expected = totals.get(pk, (0, 0))
+                    if (total, count) != expected:
+                        stale.append(model(pk=pk, **dict(zip(fields, expected))))
+                model.objects.bulk_update(stale, fields, batch_size=BATCH_SIZE)
+                fixed += len(stale)
+
+        if fixed: bump_generation()  # progress induk/proyek di Gantt ikut berubah
+        self.stdout.write(self.style.SUCCESS(f"Selesai! {fixed} baris roll-up diperbaiki."))
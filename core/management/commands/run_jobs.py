@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from core.jobs import claim_next, run_job, worker_name
+
+class Command(BaseCommand):
+    help = 'Worker antrian job latar belakang (import tugas/user, dll)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Proses semua job yang ada lalu berhenti')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Jeda polling (detik) saat antrian kosong')
+
+    def handle(self, *args, **options):
+        name = worker_name()
+        self.stdout.write(f"Worker {name} berjalan...")
+
+        while True:
+            job = claim_next(name)
+            if job is None:
+                if options['once']: break
+                time.sleep(options['sleep'])
+                continue
+
+            self.stdout.write(f"Memproses {job}...")
+            job = run_job(job)
+            style = self.style.SUCCESS if job.status == 'DONE' else self.style.ERROR
+            self.stdout.write(style(f"{job}: {job.result_message} ({job.error_count} error)"))
+
+        self.stdout.write(self.style.SUCCESS("Antrian kosong, worker berhenti."))
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from core.sweeper import sweep_overdue
+
+class Command(BaseCommand):
+    help = 'Tandai OVERDUE semua tugas yang lewat tenggat (kecuali DONE/DROP/ON_HOLD); sekali seminggu otomatis run penuh'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Abaikan watermark, periksa semua tugas (otomatis sekali seminggu)')
+        parser.add_argument('--loop', action='store_true', help='Mode terjadwal: jalan terus dengan jeda --interval')
+        parser.add_argument('--interval', type=float, default=3600.0, help='Jeda antar run (detik) untuk --loop')
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            count, since = sweep_overdue(full=full)
+            self.stdout.write(self.style.SUCCESS(f"Selesai! {count} tugas ditandai OVERDUE (sejak {since or 'awal'})."))
+            if not options['loop']: break
+            full = False
+            time.sleep(options['interval'])
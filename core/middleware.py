@@ -0,0 +1,25 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# --- STATIC FILES (WSGI & ASGI) ---
+# WhiteNoiseMiddleware hanya sync: di ASGI semua request akan lewat satu thread sync.
+# Versi ini melayani file statis dengan lookup yang sama, lalu meneruskan request lain secara async.
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response): markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self): return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # autorefresh (DEBUG) mencari file di disk; produksi cukup lookup dict
+        if self.autorefresh: static_file = await sync_to_async(self.find_file)(request.path_info)
+        else: static_file = self.files.get(request.path_info)
+        if static_file is not None: return self.serve(static_file, request)
+        return await self.get_response(request)
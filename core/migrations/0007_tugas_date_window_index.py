@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_tugas_pemberi_tugas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tugas',
+            index=models.Index(fields=['tanggal_mulai', 'tenggat_waktu'], name='tugas_mulai_tenggat_idx'),
+        ),
+    ]
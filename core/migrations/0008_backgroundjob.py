@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tugas_date_window_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('IMPORT_TUGAS', 'Import Tugas'), ('IMPORT_USER', 'Import User')], max_length=30)),
+                ('status', models.CharField(choices=[('PENDING', 'Menunggu'), ('RUNNING', 'Diproses'), ('DONE', 'Selesai'), ('FAILED', 'Gagal')], default='PENDING', max_length=10)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('rows_done', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('result_message', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Job Latar Belakang',
+                'verbose_name_plural': 'Job Latar Belakang',
+                'indexes': [models.Index(fields=['status', 'id'], name='job_status_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobUploadChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='core.backgroundjob')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'seq'), name='job_chunk_seq_uniq')],
+            },
+        ),
+    ]
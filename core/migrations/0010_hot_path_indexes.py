@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_codesequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['target_model', 'target_id', 'timestamp'], name='audit_target_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tugas',
+            index=models.Index(fields=['status', 'tenggat_waktu'], name='tugas_status_tenggat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tugas',
+            index=models.Index(fields=['tenggat_waktu'], name='tugas_tenggat_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bulan', models.DateField()),
+                ('action', models.CharField(choices=[('CREATE', 'Membuat'), ('UPDATE', 'Mengubah'), ('DELETE', 'Menghapus')], max_length=10)),
+                ('target_model', models.CharField(max_length=50)),
+                ('target_id', models.CharField(max_length=50)),
+                ('details', models.TextField()),
+                ('timestamp', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Arsip Log Audit',
+                'verbose_name_plural': 'Arsip Log Audit',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+        ),
+        migrations.AddField(
+            model_name='auditlogarchive',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='auditlogarchive',
+            index=models.Index(fields=['bulan', 'timestamp'], name='audit_arsip_bulan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlogarchive',
+            index=models.Index(fields=['target_model', 'target_id', 'timestamp'], name='audit_arsip_target_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:23
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def period_start(frekuensi, d):
+    if frekuensi == 'WEEKLY': return d - timedelta(days=d.weekday())
+    if frekuensi == 'MONTHLY': return d.replace(day=1)
+    if frekuensi == 'QUARTERLY': return d.replace(month=(d.month - 1) // 3 * 3 + 1, day=1)
+    return d.replace(month=1, day=1)
+
+
+def link_existing_occurrences(apps, schema_editor):
+    # Tugas BAU lama (dicocokkan lewat nama "<template> (<suffix>)") dihubungkan ke
+    # template + periodenya, agar generate_bau tidak membuat duplikat
+    db = schema_editor.connection.alias
+    TemplateBAU = apps.get_model('core', 'TemplateBAU')
+    Tugas = apps.get_model('core', 'Tugas')
+    for tmpl in TemplateBAU.objects.using(db).all():
+        seen = set()
+        for t in Tugas.objects.using(db).filter(tipe_tugas='BAU', pemilik_grup_id=tmpl.pemilik_grup_id, template_bau__isnull=True,
+                                      nama_tugas__startswith=f"{tmpl.nama_tugas} (").order_by('id'):
+            periode = period_start(tmpl.frekuensi, t.tanggal_mulai)
+            if periode in seen: continue
+            seen.add(periode)
+            Tugas.objects.using(db).filter(pk=t.pk).update(template_bau=tmpl, periode=periode)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_audit_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tugas',
+            name='periode',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tugas',
+            name='template_bau',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='core.templatebau'),
+        ),
+        migrations.AddConstraint(
+            model_name='tugas',
+            constraint=models.UniqueConstraint(fields=('template_bau', 'periode'), name='tugas_bau_periode_uniq'),
+        ),
+        migrations.RunPython(link_existing_occurrences, migrations.RunPython.noop),
+    ]
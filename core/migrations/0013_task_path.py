@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:26
+
+from django.db import migrations, models
+
+
+def use_byte_collation(apps, schema_editor):
+    # path_range() mengandalkan urutan byte ('/' < '0'); collation locale PostgreSQL (mis. en_US)
+    # tidak menjaminnya, jadi kolom jalur memakai collation "C". SQLite sudah BINARY.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE core_tugas ALTER COLUMN jalur TYPE varchar(255) COLLATE "C"')
+
+
+def fill_paths(apps, schema_editor):
+    Tugas = apps.get_model('core', 'Tugas')
+    tasks = Tugas.objects.using(schema_editor.connection.alias)
+    parent = dict(tasks.values_list('id', 'induk_id'))
+    paths = {}
+
+    def path(i, seen=()):
+        if i not in paths:
+            p = parent.get(i)
+            paths[i] = (path(p, seen + (i,)) if p and p not in seen else '') + f"{i}/"
+        return paths[i]
+
+    rows = [Tugas(id=i, jalur=path(i)) for i in parent]
+    tasks.bulk_update(rows, ['jalur'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_bau_occurrence_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tugas',
+            name='jalur',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(use_byte_collation, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tugas',
+            index=models.Index(fields=['jalur'], name='tugas_jalur_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
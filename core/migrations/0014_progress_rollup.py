@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:28
+
+from django.db import migrations, models
+
+
+def fill_rollup(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Tugas = apps.get_model('core', 'Tugas')
+    Proyek = apps.get_model('core', 'Proyek')
+    task_totals, project_totals = {}, {}
+    for jalur, progress, proyek_id in Tugas.objects.using(db).values_list('jalur', 'progress', 'proyek_id').iterator():
+        keys = [(task_totals, int(i)) for i in jalur.split('/')[:-2]] + ([(project_totals, proyek_id)] if proyek_id else [])
+        for target, key in keys:
+            total, count = target.get(key, (0, 0))
+            target[key] = (total + progress, count + 1)
+    Tugas.objects.using(db).bulk_update([Tugas(pk=k, rollup_total=t, rollup_count=c) for k, (t, c) in task_totals.items()], ['rollup_total', 'rollup_count'], batch_size=500)
+    Proyek.objects.using(db).bulk_update([Proyek(pk=k, progress_total=t, progress_count=c) for k, (t, c) in project_totals.items()], ['progress_total', 'progress_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_task_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyek',
+            name='progress_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proyek',
+            name='progress_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tugas',
+            name='rollup_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tugas',
+            name='rollup_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
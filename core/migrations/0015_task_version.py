@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_progress_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tugas',
+            name='versi',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,195 +1,485 @@
-from django.db import models, IntegrityError
-from django.contrib.auth.models import User, Group
-from django.core.exceptions import ValidationError
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from datetime import date
-
-# --- EXTENSION: USER ROLE ---
-class UserProfile(models.Model):
-    ROLE_CHOICES = [
-        ('ADMIN', 'Group Admin'),      
-        ('LEADER', 'Team Leader'),     
-        ('MEMBER', 'Member'),          
-    ]
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
-    role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='MEMBER')
-
-    class Meta:
-        verbose_name = "Profil Pengguna"
-        verbose_name_plural = "Profil Pengguna" # FIX: Nama jamak di admin panel
-
-    def __str__(self): return f"{self.user.username} - {self.role}"
-
-@receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
-    if created: UserProfile.objects.get_or_create(user=instance)
-    else: 
-        if hasattr(instance, 'profile'): instance.profile.save()
-
-# --- PROYEK ---
-class Proyek(models.Model):
-    STATUS_CHOICES = [
-        ('RUNNING', 'Berjalan'),
-        ('ON_HOLD', 'Ditunda (On Hold)'),
-        ('DROP', 'Dibatalkan (Drop)'),
-        ('DONE', 'Selesai'),
-    ]
-
-    kode_proyek = models.CharField(max_length=20, unique=True, editable=False)
-    nama_proyek = models.CharField(max_length=200)
-    deskripsi = models.TextField(blank=True)
-    
-    tanggal_mulai = models.DateField(verbose_name="Start (Plan)")
-    tanggal_selesai = models.DateField(verbose_name="End (Plan)")
-    tanggal_mulai_aktual = models.DateField(null=True, blank=True, verbose_name="Start (Actual)")
-    tanggal_selesai_aktual = models.DateField(null=True, blank=True, verbose_name="End (Actual)")
-    
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='RUNNING')
-    pemilik_grup = models.ForeignKey(Group, on_delete=models.CASCADE)
-    dibuat_oleh = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-
-    class Meta:
-        verbose_name = "Proyek"
-        verbose_name_plural = "Proyek" # FIX: Nama jamak di admin panel
-
-    def clean(self):
-        # Validasi Sabtu/Minggu untuk Plan
-        if self.tanggal_mulai and self.tanggal_mulai.weekday() >= 5:
-            raise ValidationError({'tanggal_mulai': 'Start Date (Plan) tidak boleh hari libur (Sabtu/Minggu).'})
-        
-        # Validasi Sabtu/Minggu untuk Actual
-        if self.tanggal_mulai_aktual and self.tanggal_mulai_aktual.weekday() >= 5:
-            raise ValidationError({'tanggal_mulai_aktual': 'Start Date (Actual) tidak boleh hari libur (Sabtu/Minggu).'})
-
-        if self.tanggal_mulai and self.tanggal_selesai:
-            if self.tanggal_selesai < self.tanggal_mulai:
-                raise ValidationError({'tanggal_selesai': 'Tanggal selesai tidak boleh mendahului tanggal mulai.'})
-
-    def save(self, *args, **kwargs):
-        if not self.kode_proyek:
-            last = Proyek.objects.all().order_by('id').last()
-            new_id = last.id + 1 if last else 1
-            self.kode_proyek = f"P-{new_id:03d}"
-        super().save(*args, **kwargs)
-
-    def __str__(self): return f"{self.kode_proyek} - {self.nama_proyek}"
-
-# --- TUGAS ---
-class Tugas(models.Model):
-    TIPE_CHOICES = [
-        ('PROJECT', 'Proyek'),
-        ('BAU', 'Business As Usual'),
-        ('ADHOC', 'Adhoc'),
-    ]
-    STATUS_CHOICES = [
-        ('TODO', 'Akan Dikerjakan'),
-        ('IN_PROGRESS', 'Sedang Dikerjakan'),
-        ('REVIEW', 'Dalam Review'),
-        ('DONE', 'Selesai'),
-        ('OVERDUE', 'Terlambat'),
-        ('ON_HOLD', 'Ditunda'),
-        ('DROP', 'Dibatalkan'),
-    ]
-
-    kode_tugas = models.CharField(max_length=50, unique=True, editable=False)
-    nama_tugas = models.CharField(max_length=200)
-    tipe_tugas = models.CharField(max_length=20, choices=TIPE_CHOICES, default='PROJECT')
-    
-    proyek = models.ForeignKey(Proyek, on_delete=models.CASCADE, null=True, blank=True, related_name='tasks')
-    induk = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='subtasks')
-    tergantung_pada = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='dependents')
-    
-    pemberi_tugas = models.CharField(max_length=150, null=True, blank=True, help_text="Bisa nama user sistem atau nama manual")
-    
-    tanggal_mulai = models.DateField(verbose_name="Start (Plan)")
-    tenggat_waktu = models.DateField(verbose_name="End (Plan)")
-    tanggal_mulai_aktual = models.DateField(null=True, blank=True, verbose_name="Start (Actual)")
-    tanggal_selesai_aktual = models.DateField(null=True, blank=True, verbose_name="End (Actual)")
-
-    ditugaskan_ke = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='assigned_tasks')
-    progress = models.IntegerField(default=0, help_text="Persentase 0-100")
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='TODO')
-    
-    pemilik_grup = models.ForeignKey(Group, on_delete=models.CASCADE)
-
-    class Meta:
-        verbose_name = "Tugas"
-        verbose_name_plural = "Tugas" # FIX: Menghapus akhiran 's' otomatis
-
-    def clean(self):
-        # 1. Validasi Status & Progress
-        if self.status == 'DONE' and self.progress < 100:
-            raise ValidationError({'status': 'Status DONE hanya boleh jika Progress 100%.'})
-        
-        if self.progress == 100 and self.status not in ['DONE', 'OVERDUE', 'DROP']:
-             raise ValidationError({'progress': 'Jika Progress 100%, Status harus DONE/Selesai.'})
-
-        # 2. Validasi Hari Libur (Sabtu/Minggu) - Plan
-        if self.tanggal_mulai and self.tanggal_mulai.weekday() >= 5:
-            raise ValidationError({'tanggal_mulai': 'Start Date (Plan) tidak boleh jatuh pada hari libur (Sabtu/Minggu).'})
-
-        # 3. Validasi Hari Libur (Sabtu/Minggu) - Actual
-        if self.tanggal_mulai_aktual and self.tanggal_mulai_aktual.weekday() >= 5:
-            raise ValidationError({'tanggal_mulai_aktual': 'Start Date (Actual) tidak boleh jatuh pada hari libur (Sabtu/Minggu).'})
-
-        # 4. Validasi Tipe Tugas
-        if self.tipe_tugas == 'PROJECT' and not self.proyek:
-            raise ValidationError({'proyek': 'Tugas tipe Proyek WAJIB memilih Proyek.'})
-        
-        if self.tipe_tugas == 'ADHOC' and not self.pemberi_tugas:
-            raise ValidationError({'pemberi_tugas': 'Tugas Adhoc WAJIB mengisi Pemberi Tugas.'})
-
-    def save(self, *args, **kwargs):
-        # Inherit dari induk jika ada
-        if self.induk:
-            self.tipe_tugas = self.induk.tipe_tugas
-            self.proyek = self.induk.proyek
-
-        # Auto generate kode tugas
-        if not self.kode_tugas:
-            if self.induk:
-                count = self.induk.subtasks.count() + 1
-                self.kode_tugas = f"{self.induk.kode_tugas}.{count}"
-            else:
-                last_id = Tugas.objects.filter(induk__isnull=True).count() + 1
-                self.kode_tugas = f"T-{last_id:03d}"
-        
-        # Auto set Actual End Date jika DONE
-        if self.status == 'DONE' and not self.tanggal_selesai_aktual:
-            self.tanggal_selesai_aktual = date.today()
-
-        super().save(*args, **kwargs)
-
-    def __str__(self): return f"{self.kode_tugas} - {self.nama_tugas}"
-
-# --- Template BAU ---
-class TemplateBAU(models.Model):
-    FREKUENSI_CHOICES = [
-        ('WEEKLY', 'Mingguan'), ('MONTHLY', 'Bulanan'),
-        ('QUARTERLY', 'Triwulan'), ('YEARLY', 'Tahunan'),
-    ]
-    nama_tugas = models.CharField(max_length=200)
-    deskripsi = models.TextField(blank=True)
-    frekuensi = models.CharField(max_length=20, choices=FREKUENSI_CHOICES)
-    default_pic = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    pemilik_grup = models.ForeignKey(Group, on_delete=models.CASCADE)
-    
-    class Meta:
-        verbose_name = "Template BAU"
-        verbose_name_plural = "Template BAU" # FIX
-
-    def __str__(self): return f"{self.nama_tugas} ({self.frekuensi})"
-
-class AuditLog(models.Model):
-    ACTION_CHOICES = [('CREATE', 'Membuat'), ('UPDATE', 'Mengubah'), ('DELETE', 'Menghapus')]
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
-    target_model = models.CharField(max_length=50)
-    target_id = models.CharField(max_length=50)
-    details = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        verbose_name = "Log Audit"
-        verbose_name_plural = "Log Audit" # FIX
\ No newline at end of file
+import re
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.contrib.auth.models import User, Group
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from datetime import date
+
+# --- EXTENSION: USER ROLE ---
+class UserProfile(models.Model):
+    ROLE_CHOICES = [
+        ('ADMIN', 'Group Admin'),      
+        ('LEADER', 'Team Leader'),     
+        ('MEMBER', 'Member'),          
+    ]
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='MEMBER')
+
+    class Meta:
+        verbose_name = "Profil Pengguna"
+        verbose_name_plural = "Profil Pengguna" # FIX: Nama jamak di admin panel
+
+    def __str__(self): return f"{self.user.username} - {self.role}"
+
+@receiver(post_save, sender=User)
+def create_or_update_user_profile(sender, instance, created, **kwargs):
+    if created: UserProfile.objects.get_or_create(user=instance)
+    else: 
+        if hasattr(instance, 'profile'): instance.profile.save()
+
+# --- SEQUENCE KODE (Proyek/Tugas) ---
+class CodeSequence(models.Model):
+    # name: 'proyek', 'tugas' (tugas utama) atau 'tugas:<id induk>' (subtask)
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Sequence Kode"
+        verbose_name_plural = "Sequence Kode"
+
+    @classmethod
+    def reserve(cls, name, count=1, seed=None):
+        """Reservasi `count` nomor berurutan secara atomik; return nomor pertama."""
+        with transaction.atomic():
+            if not cls.objects.filter(name=name).update(value=F('value') + count):
+                # Counter baru: mulai dari kode terbesar yang sudah ada (seed) agar tidak bentrok
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(name=name, value=(seed() if seed else 0) + count)
+                except IntegrityError:
+                    cls.objects.filter(name=name).update(value=F('value') + count)
+            last = cls.objects.filter(name=name).values_list('value', flat=True).get()
+        return last - count + 1
+
+    def __str__(self): return f"{self.name} = {self.value}"
+
+# --- WATERMARK PROSES TERJADWAL ---
+class Watermark(models.Model):
+    # name -> tanggal run terakhir, mis. 'overdue' dan 'overdue:full' untuk sweeper OVERDUE
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateField()
+
+    def __str__(self): return f"{self.name} = {self.value}"
+
+def max_code_suffix(codes):
+    # 'P-012' -> 12, 'T-001.3' -> 3; dipakai hanya sekali saat counter pertama kali dibuat
+    nums = [int(m.group(1)) for c in codes if (m := re.search(r'(\d+)$', c or ''))]
+    return max(nums, default=0)
+
+# --- PROYEK ---
+class Proyek(models.Model):
+    STATUS_CHOICES = [
+        ('RUNNING', 'Berjalan'),
+        ('ON_HOLD', 'Ditunda (On Hold)'),
+        ('DROP', 'Dibatalkan (Drop)'),
+        ('DONE', 'Selesai'),
+    ]
+
+    kode_proyek = models.CharField(max_length=20, unique=True, editable=False)
+    nama_proyek = models.CharField(max_length=200)
+    deskripsi = models.TextField(blank=True)
+    
+    tanggal_mulai = models.DateField(verbose_name="Start (Plan)")
+    tanggal_selesai = models.DateField(verbose_name="End (Plan)")
+    tanggal_mulai_aktual = models.DateField(null=True, blank=True, verbose_name="Start (Actual)")
+    tanggal_selesai_aktual = models.DateField(null=True, blank=True, verbose_name="End (Actual)")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='RUNNING')
+    pemilik_grup = models.ForeignKey(Group, on_delete=models.CASCADE)
+    dibuat_oleh = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+
+    # Roll-up progress semua tugas proyek (jumlah & banyaknya), disesuaikan per delta (apply_rollup)
+    progress_total = models.IntegerField(default=0, editable=False)
+    progress_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        verbose_name = "Proyek"
+        verbose_name_plural = "Proyek" # FIX: Nama jamak di admin panel
+
+    def clean(self):
+        # Validasi Sabtu/Minggu untuk Plan
+        if self.tanggal_mulai and self.tanggal_mulai.weekday() >= 5:
+            raise ValidationError({'tanggal_mulai': 'Start Date (Plan) tidak boleh hari libur (Sabtu/Minggu).'})
+        
+        # Validasi Sabtu/Minggu untuk Actual
+        if self.tanggal_mulai_aktual and self.tanggal_mulai_aktual.weekday() >= 5:
+            raise ValidationError({'tanggal_mulai_aktual': 'Start Date (Actual) tidak boleh hari libur (Sabtu/Minggu).'})
+
+        if self.tanggal_mulai and self.tanggal_selesai:
+            if self.tanggal_selesai < self.tanggal_mulai:
+                raise ValidationError({'tanggal_selesai': 'Tanggal selesai tidak boleh mendahului tanggal mulai.'})
+
+    def save(self, *args, **kwargs):
+        if not self.kode_proyek:
+            new_id = CodeSequence.reserve('proyek', seed=lambda: max_code_suffix(Proyek.objects.values_list('kode_proyek', flat=True)))
+            self.kode_proyek = f"P-{new_id:03d}"
+        # Kolom roll-up hanya diubah lewat UPDATE F(); save biasa tidak boleh menimpanya
+        if not self._state.adding: kwargs.setdefault('update_fields', non_rollup_fields(self))
+        super().save(*args, **kwargs)
+
+    @property
+    def progress(self): return round(self.progress_total / self.progress_count) if self.progress_count else 0
+
+    def __str__(self): return f"{self.kode_proyek} - {self.nama_proyek}"
+
+# --- TUGAS ---
+class Tugas(models.Model):
+    TIPE_CHOICES = [
+        ('PROJECT', 'Proyek'),
+        ('BAU', 'Business As Usual'),
+        ('ADHOC', 'Adhoc'),
+    ]
+    STATUS_CHOICES = [
+        ('TODO', 'Akan Dikerjakan'),
+        ('IN_PROGRESS', 'Sedang Dikerjakan'),
+        ('REVIEW', 'Dalam Review'),
+        ('DONE', 'Selesai'),
+        ('OVERDUE', 'Terlambat'),
+        ('ON_HOLD', 'Ditunda'),
+        ('DROP', 'Dibatalkan'),
+    ]
+
+    kode_tugas = models.CharField(max_length=50, unique=True, editable=False)
+    nama_tugas = models.CharField(max_length=200)
+    tipe_tugas = models.CharField(max_length=20, choices=TIPE_CHOICES, default='PROJECT')
+    
+    proyek = models.ForeignKey(Proyek, on_delete=models.CASCADE, null=True, blank=True, related_name='tasks')
+    induk = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='subtasks')
+    tergantung_pada = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='dependents')
+    
+    pemberi_tugas = models.CharField(max_length=150, null=True, blank=True, help_text="Bisa nama user sistem atau nama manual")
+    
+    tanggal_mulai = models.DateField(verbose_name="Start (Plan)")
+    tenggat_waktu = models.DateField(verbose_name="End (Plan)")
+    tanggal_mulai_aktual = models.DateField(null=True, blank=True, verbose_name="Start (Actual)")
+    tanggal_selesai_aktual = models.DateField(null=True, blank=True, verbose_name="End (Actual)")
+
+    ditugaskan_ke = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='assigned_tasks')
+    progress = models.IntegerField(default=0, help_text="Persentase 0-100")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='TODO')
+    
+    pemilik_grup = models.ForeignKey(Group, on_delete=models.CASCADE)
+
+    # Optimistic locking: naik setiap kali baris ditulis (save, fast path, batch)
+    versi = models.PositiveIntegerField(default=0, editable=False)
+
+    # Materialized path hierarki induk: "<id leluhur>/.../<id>/" (dirawat oleh save())
+    jalur = models.CharField(max_length=255, blank=True, default='', editable=False)
+
+    # Roll-up progress seluruh turunan (jumlah & banyaknya), disesuaikan per delta oleh save()
+    rollup_total = models.IntegerField(default=0, editable=False)
+    rollup_count = models.IntegerField(default=0, editable=False)
+
+    # Occurrence BAU: (template, awal periode) unik -> generate_bau idempoten
+    template_bau = models.ForeignKey('TemplateBAU', on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences')
+    periode = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        verbose_name = "Tugas"
+        verbose_name_plural = "Tugas" # FIX: Menghapus akhiran 's' otomatis
+        indexes = [
+            # Query jendela tanggal kalender (overlap start/end)
+            models.Index(fields=['tanggal_mulai', 'tenggat_waktu'], name='tugas_mulai_tenggat_idx'),
+            # Filter status di daftar tugas / dashboard (+ rentang deadline untuk sweeper OVERDUE)
+            models.Index(fields=['status', 'tenggat_waktu'], name='tugas_status_tenggat_idx'),
+            # Filter rentang deadline di daftar tugas
+            models.Index(fields=['tenggat_waktu'], name='tugas_tenggat_idx'),
+            # Subtree / leluhur lewat materialized path (range scan)
+            models.Index(fields=['jalur'], name='tugas_jalur_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['template_bau', 'periode'], name='tugas_bau_periode_uniq'),
+        ]
+
+    def clean(self):
+        # 1. Validasi Status & Progress
+        if self.status == 'DONE' and self.progress < 100:
+            raise ValidationError({'status': 'Status DONE hanya boleh jika Progress 100%.'})
+        
+        if self.progress == 100 and self.status not in ['DONE', 'OVERDUE', 'DROP']:
+             raise ValidationError({'progress': 'Jika Progress 100%, Status harus DONE/Selesai.'})
+
+        # 2. Validasi Hari Libur (Sabtu/Minggu) - Plan
+        if self.tanggal_mulai and self.tanggal_mulai.weekday() >= 5:
+            raise ValidationError({'tanggal_mulai': 'Start Date (Plan) tidak boleh jatuh pada hari libur (Sabtu/Minggu).'})
+
+        # 3. Validasi Hari Libur (Sabtu/Minggu) - Actual
+        if self.tanggal_mulai_aktual and self.tanggal_mulai_aktual.weekday() >= 5:
+            raise ValidationError({'tanggal_mulai_aktual': 'Start Date (Actual) tidak boleh jatuh pada hari libur (Sabtu/Minggu).'})
+
+        # 4. Validasi Tipe Tugas
+        if self.tipe_tugas == 'PROJECT' and not self.proyek:
+            raise ValidationError({'proyek': 'Tugas tipe Proyek WAJIB memilih Proyek.'})
+        
+        if self.tipe_tugas == 'ADHOC' and not self.pemberi_tugas:
+            raise ValidationError({'pemberi_tugas': 'Tugas Adhoc WAJIB mengisi Pemberi Tugas.'})
+
+        # 5. Validasi Induk (tidak boleh dipindah ke bawah turunannya sendiri)
+        if self.induk_id and self.pk and (self.induk_id == self.pk or (self.jalur and self.induk.jalur.startswith(self.jalur))):
+            raise ValidationError({'induk': 'Induk tidak boleh tugas ini sendiri atau turunannya.'})
+
+        # 6. Validasi Dependensi (tidak boleh siklus)
+        from .dag import would_cycle  # import lokal: dag bergantung pada models
+        if self.tergantung_pada_id and (self.tergantung_pada_id == self.pk or would_cycle(self, self.tergantung_pada_id)):
+            raise ValidationError({'tergantung_pada': 'Dependensi ini membentuk siklus (A -> B -> A).'})
+
+    def save(self, *args, **kwargs):
+        # Inherit dari induk jika ada
+        if self.induk:
+            self.tipe_tugas = self.induk.tipe_tugas
+            self.proyek = self.induk.proyek
+
+        # Auto generate kode tugas
+        if not self.kode_tugas:
+            if self.induk:
+                count = Tugas.reserve_codes(self.induk)
+                self.kode_tugas = f"{self.induk.kode_tugas}.{count}"
+            else:
+                last_id = Tugas.reserve_codes(None)
+                self.kode_tugas = f"T-{last_id:03d}"
+        
+        # Auto set Actual End Date jika DONE
+        if self.status == 'DONE' and not self.tanggal_selesai_aktual:
+            self.tanggal_selesai_aktual = date.today()
+
+        self.versi += 1
+        with transaction.atomic():
+            old = None
+            if not self._state.adding:
+                # Delta roll-up dari baris terkini (dikunci sampai commit), bukan snapshot saat dimuat:
+                # penulis lain di antaranya tidak membuat agregat bergeser
+                old = Tugas.objects.select_for_update().filter(pk=self.pk).values_list('progress', 'proyek_id', 'jalur', 'rollup_total', 'rollup_count').first()
+                if old: self.jalur, self.rollup_total, self.rollup_count = old[2:]
+                kwargs.setdefault('update_fields', non_rollup_fields(self))
+            super().save(*args, **kwargs)
+            self._sync_path()
+            self._apply_rollup(old and old[:3])
+        self._rollup_state = (self.progress, self.proyek_id, self.jalur)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        # Snapshot untuk delta roll-up (hanya jika kolomnya ikut dimuat, tanpa query tambahan)
+        if {'progress', 'proyek_id', 'jalur'} <= set(field_names):
+            obj._rollup_state = (obj.progress, obj.proyek_id, obj.jalur)
+            # Scope lama untuk invalidasi cache Gantt/kalender per grup (signals)
+            if {'pemilik_grup_id', 'ditugaskan_ke_id'} <= set(field_names):
+                obj._scope_state = (obj.pemilik_grup_id, obj.ditugaskan_ke_id, obj.proyek_id, obj.jalur)
+        return obj
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._rollup_state = (self.progress, self.proyek_id, self.jalur)
+        self._scope_state = (self.pemilik_grup_id, self.ditugaskan_ke_id, self.proyek_id, self.jalur)
+
+    def _apply_rollup(self, old):
+        # Sesuaikan agregat leluhur & proyek dengan delta, tanpa menjumlah ulang anak-anaknya
+        tasks, projects = {}, {}
+        def add(target, key, total, count):
+            t, c = target.get(key, (0, 0))
+            target[key] = (t + total, c + count)
+
+        if old is None:
+            for i in path_ancestor_ids(self.jalur): add(tasks, i, self.progress, 1)
+            add(projects, self.proyek_id, self.progress, 1)
+        else:
+            old_progress, old_proyek, old_path = old
+            if old_path != self.jalur:
+                # Subtree pindah induk: leluhur lama kehilangan, leluhur baru mendapat seluruh subtree
+                for i in path_ancestor_ids(old_path): add(tasks, i, -(old_progress + self.rollup_total), -(1 + self.rollup_count))
+                for i in path_ancestor_ids(self.jalur): add(tasks, i, self.progress + self.rollup_total, 1 + self.rollup_count)
+            else:
+                for i in path_ancestor_ids(self.jalur): add(tasks, i, self.progress - old_progress, 0)
+            if old_proyek != self.proyek_id:
+                add(projects, old_proyek, -old_progress, -1)
+                add(projects, self.proyek_id, self.progress, 1)
+            else:
+                add(projects, self.proyek_id, self.progress - old_progress, 0)
+        apply_rollup(tasks, projects)
+
+    @property
+    def rollup_progress(self):
+        """Rata-rata progress seluruh turunan; progress sendiri jika tidak punya subtask."""
+        return round(self.rollup_total / self.rollup_count) if self.rollup_count else self.progress
+
+    def _sync_path(self):
+        path = f"{self.induk.jalur if self.induk_id else ''}{self.pk}/"
+        if path == self.jalur: return
+        if self.jalur:
+            # Induk berubah: pindahkan seluruh subtree dengan satu UPDATE berbasis set
+            Tugas.objects.filter(**path_range(self.jalur)).exclude(pk=self.pk).update(
+                jalur=Concat(Value(path), Substr('jalur', len(self.jalur) + 1)))
+        Tugas.objects.filter(pk=self.pk).update(jalur=path)
+        self.jalur = path
+
+    def descendants(self, include_self=False):
+        """Semua turunan (berapa pun kedalamannya) dalam satu query range di index jalur."""
+        qs = Tugas.objects.filter(**path_range(self.jalur))
+        return qs if include_self else qs.exclude(pk=self.pk)
+
+    def ancestor_ids(self): return path_ancestor_ids(self.jalur)
+
+    def ancestors(self):
+        """Leluhur dari akar ke induk langsung (satu query), untuk breadcrumb."""
+        ids = self.ancestor_ids()
+        by_id = Tugas.objects.in_bulk(ids)
+        return [by_id[i] for i in ids if i in by_id]
+
+    @staticmethod
+    def reserve_codes(induk, count=1):
+        """Nomor urut pertama dari blok `count` kode (tugas utama jika induk None, selain itu subtask induk)."""
+        if induk is None:
+            return CodeSequence.reserve('tugas', count, seed=lambda: max_code_suffix(Tugas.objects.filter(induk__isnull=True).values_list('kode_tugas', flat=True)))
+        induk_id = induk if isinstance(induk, int) else induk.pk
+        return CodeSequence.reserve(f"tugas:{induk_id}", count, seed=lambda: max_code_suffix(Tugas.objects.filter(induk_id=induk_id).values_list('kode_tugas', flat=True)))
+
+    def __str__(self): return f"{self.kode_tugas} - {self.nama_tugas}"
+
+def path_range(path):
+    # Semua jalur berawalan `path`: '1/5/' <= jalur < '1/50' ('/' < '0'), tetap pakai index di semua DB.
+    # Butuh perbandingan byte: SQLite BINARY, PostgreSQL kolom ber-collation "C" (migrasi 0013)
+    return {'jalur__gte': path, 'jalur__lt': path[:-1] + '0'}
+
+def path_ancestor_ids(path):
+    return [int(i) for i in path.split('/')[:-2]]
+
+def assign_paths(tasks):
+    """Isi jalur untuk tugas hasil bulk_create (save() tidak terpanggil); t._parent_jalur untuk subtask."""
+    for t in tasks:
+        t.jalur = f"{getattr(t, '_parent_jalur', '')}{t.pk}/"
+    Tugas.objects.bulk_update(tasks, ['jalur'])
+
+# --- ROLL-UP PROGRESS ---
+ROLLUP_FIELDS = {'rollup_total', 'rollup_count', 'progress_total', 'progress_count'}
+
+def non_rollup_fields(obj):
+    return [f.name for f in obj._meta.concrete_fields if not f.primary_key and f.name not in ROLLUP_FIELDS]
+
+def apply_rollup(task_deltas=None, project_deltas=None):
+    """Terapkan delta {id: (total, count)} dengan UPDATE F(); satu query per nilai delta yang sama."""
+    for model, deltas, total, count in ((Tugas, task_deltas, 'rollup_total', 'rollup_count'), (Proyek, project_deltas, 'progress_total', 'progress_count')):
+        groups = {}
+        for pk, (dt, dc) in (deltas or {}).items():
+            if pk and (dt or dc): groups.setdefault((dt, dc), []).append(pk)
+        for (dt, dc), ids in groups.items():
+            model.objects.filter(pk__in=ids).update(**{total: F(total) + dt, count: F(count) + dc})
+
+def compute_rollup(tasks):
+    """Hitung ulang agregat dari nol: satu iterasi atas (id, jalur, progress, proyek_id)."""
+    task_totals, project_totals = {}, {}
+    for pk, jalur, progress, proyek_id in tasks.values_list('id', 'jalur', 'progress', 'proyek_id').iterator(chunk_size=2000):
+        for target, key in [(task_totals, i) for i in path_ancestor_ids(jalur)] + [(project_totals, proyek_id)]:
+            total, count = target.get(key, (0, 0))
+            target[key] = (total + progress, count + 1)
+    return task_totals, project_totals
+
+def rollup_added(tasks):
+    """Roll-up untuk tugas baru hasil bulk_create (setelah assign_paths)."""
+    tasks_delta, projects_delta = {}, {}
+    for t in tasks:
+        for target, key in [(tasks_delta, i) for i in path_ancestor_ids(t.jalur)] + [(projects_delta, t.proyek_id)]:
+            total, count = target.get(key, (0, 0))
+            target[key] = (total + t.progress, count + 1)
+    apply_rollup(tasks_delta, projects_delta)
+
+# --- Template BAU ---
+class TemplateBAU(models.Model):
+    FREKUENSI_CHOICES = [
+        ('WEEKLY', 'Mingguan'), ('MONTHLY', 'Bulanan'),
+        ('QUARTERLY', 'Triwulan'), ('YEARLY', 'Tahunan'),
+    ]
+    nama_tugas = models.CharField(max_length=200)
+    deskripsi = models.TextField(blank=True)
+    frekuensi = models.CharField(max_length=20, choices=FREKUENSI_CHOICES)
+    default_pic = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    pemilik_grup = models.ForeignKey(Group, on_delete=models.CASCADE)
+    
+    class Meta:
+        verbose_name = "Template BAU"
+        verbose_name_plural = "Template BAU" # FIX
+
+    def __str__(self): return f"{self.nama_tugas} ({self.frekuensi})"
+
+class AuditLog(models.Model):
+    ACTION_CHOICES = [('CREATE', 'Membuat'), ('UPDATE', 'Mengubah'), ('DELETE', 'Menghapus')]
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    target_model = models.CharField(max_length=50)
+    target_id = models.CharField(max_length=50)
+    details = models.TextField()
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Log Audit"
+        verbose_name_plural = "Log Audit" # FIX
+        indexes = [
+            # Riwayat per objek (target_model + target_id, urut waktu)
+            models.Index(fields=['target_model', 'target_id', 'timestamp'], name='audit_target_idx'),
+            # Filter rentang tanggal & batas retensi (archive_audit)
+            models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+        ]
+
+# --- ARSIP AUDIT LOG (partisi bulanan) ---
+# Tabel AuditLog hanya menyimpan bulan-bulan terakhir; bulan yang lebih lama dipindah
+# ke sini oleh `manage.py archive_audit`. Kolom `bulan` (tanggal 1 tiap bulan) adalah
+# kunci partisi: query rentang tanggal hanya membaca bulan yang relevan lewat index.
+class AuditLogArchive(models.Model):
+    bulan = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_constraint=False)
+    action = models.CharField(max_length=10, choices=AuditLog.ACTION_CHOICES)
+    target_model = models.CharField(max_length=50)
+    target_id = models.CharField(max_length=50)
+    details = models.TextField()
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Arsip Log Audit"
+        verbose_name_plural = "Arsip Log Audit"
+        indexes = [
+            models.Index(fields=['bulan', 'timestamp'], name='audit_arsip_bulan_idx'),
+            models.Index(fields=['target_model', 'target_id', 'timestamp'], name='audit_arsip_target_idx'),
+        ]
+# --- BACKGROUND JOB (Import & operasi panjang lainnya) ---
+class BackgroundJob(models.Model):
+    KIND_CHOICES = [('IMPORT_TUGAS', 'Import Tugas'), ('IMPORT_USER', 'Import User')]
+    STATUS_CHOICES = [('PENDING', 'Menunggu'), ('RUNNING', 'Diproses'), ('DONE', 'Selesai'), ('FAILED', 'Gagal')]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    params = models.JSONField(default=dict, blank=True)
+    # Isi file upload disimpan di DB per potongan (JobUploadChunk), bukan di filesystem web:
+    # worker di dyno/mesin lain tetap bisa membacanya tanpa storage bersama
+    file_name = models.CharField(max_length=255, blank=True)
+
+    total_rows = models.IntegerField(null=True, blank=True)
+    rows_done = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    result_message = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Diperbarui worker tiap chunk; RUNNING tanpa heartbeat > JOB_LEASE_SECONDS = worker mati
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Job Latar Belakang"
+        verbose_name_plural = "Job Latar Belakang"
+        indexes = [models.Index(fields=['status', 'id'], name='job_status_idx')]
+
+    def __str__(self): return f"#{self.pk} {self.kind} ({self.status})"
+
+class JobUploadChunk(models.Model):
+    # Potongan berurutan file upload job (maks. UPLOAD_CHUNK_BYTES); dihapus setelah job DONE/FAILED
+    job = models.ForeignKey(BackgroundJob, on_delete=models.CASCADE, related_name='chunks')
+    seq = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['job', 'seq'], name='job_chunk_seq_uniq')]
\ No newline at end of file
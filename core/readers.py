@@ -0,0 +1,61 @@
+import csv
+import io
+from itertools import islice
+import openpyxl
+
+# --- STREAMING SPREADSHEET / CSV READER ---
+# File upload dibaca baris per baris (openpyxl read-only atau csv.reader),
+# sehingga memori puncak tidak bergantung pada ukuran file.
+
+CHUNK_SIZE = 500
+TEXT_DELIMITERS = {'.csv': ',', '.tsv': '\t', '.txt': '\t'}
+
+
+def iter_upload_rows(uploaded, min_row=2):
+    """Yield (nomor_baris, tuple_nilai) mulai dari baris data (lewati header)."""
+    name = (getattr(uploaded, 'name', '') or '').lower()
+    ext = name[name.rfind('.'):] if '.' in name else ''
+
+    if ext in TEXT_DELIMITERS:
+        uploaded.seek(0)
+        text = io.TextIOWrapper(uploaded, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.reader(text, delimiter=TEXT_DELIMITERS[ext])
+            for idx, row in enumerate(reader, start=1):
+                if idx < min_row: continue
+                yield idx, tuple(v.strip() or None for v in row)
+        finally:
+            text.detach()
+        return
+
+    wb = openpyxl.load_workbook(uploaded, read_only=True, data_only=True)
+    try:
+        for idx, row in enumerate(wb.active.iter_rows(min_row=min_row, values_only=True), start=min_row):
+            yield idx, row
+    finally:
+        wb.close()
+
+
+def count_upload_rows(uploaded, min_row=2):
+    """Perkiraan jumlah baris data (untuk progress bar); None jika tidak diketahui."""
+    name = (getattr(uploaded, 'name', '') or '').lower()
+    try:
+        if name.endswith(tuple(TEXT_DELIMITERS)):
+            uploaded.seek(0)
+            lines = sum(chunk.count(b'\n') for chunk in iter(lambda: uploaded.read(1 << 16), b''))
+            return max(lines - (min_row - 1), 0)
+        wb = openpyxl.load_workbook(uploaded, read_only=True)
+        try: return max((wb.active.max_row or 0) - (min_row - 1), 0) or None
+        finally: wb.close()
+    except Exception:
+        return None
+    finally:
+        uploaded.seek(0)
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk: return
+        yield chunk
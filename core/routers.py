@@ -0,0 +1,114 @@
+import contextvars
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# --- READ REPLICA ROUTING ---
+# Opsional: aktif jika DATABASES punya alias 'replica' (env DATABASE_REPLICA_URL).
+# Hanya view yang ditandai read-only (@replica_read / use_replica = True) yang membaca dari
+# replica, dan hanya untuk GET/HEAD. Setelah user melakukan write, request-nya "menempel" ke
+# primary selama REPLICA_STICKY_SECONDS (cookie), agar selalu melihat tulisannya sendiri.
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE = 'db_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Session & user login di-resolve lazy di dalam view; selalu dari primary agar tidak kena lag replikasi
+PRIMARY_ONLY_APPS = {'sessions', 'auth', 'contenttypes'}
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or model._meta.app_label in PRIMARY_ONLY_APPS: return 'default'
+        return REPLICA_ALIAS if replica_enabled() else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replica berisi data yang sama dengan primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True  # lokal (dua file SQLite): `migrate --database=replica`
+
+
+def replica_read(view_func):
+    """Tandai function view sebagai read-only (boleh dibaca dari replica)."""
+    view_func.use_replica = True
+    return view_func
+
+
+def _wants_replica(view_func):
+    return getattr(view_func, 'use_replica', False) or getattr(getattr(view_func, 'view_class', None), 'use_replica', False)
+
+
+def _stream_on_replica(content):
+    # Isi StreamingHttpResponse diiterasi setelah middleware selesai: pasang flag per chunk
+    it = iter(content)
+    while True:
+        token = _use_replica.set(True)
+        try: chunk = next(it)
+        except StopIteration: return
+        finally: _use_replica.reset(token)
+        yield chunk
+
+
+async def _astream_on_replica(content):
+    # Versi ASGI: query tiap chunk berjalan lewat sync_to_async yang menyalin context saat ini
+    it = aiter(content)
+    while True:
+        token = _use_replica.set(True)
+        try: chunk = await anext(it)
+        except StopAsyncIteration: return
+        finally: _use_replica.reset(token)
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response): markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self): return self.__acall__(request)
+        request.use_replica = False
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        request.use_replica = False
+        token = _use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.finish(request, response)
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS and replica_enabled():
+            # Read-your-writes: request berikutnya dari browser ini tetap ke primary sebentar
+            sticky = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(PIN_COOKIE, str(int(time.time()) + sticky), max_age=sticky, httponly=True, samesite='Lax')
+        elif request.use_replica and response.streaming:
+            wrap = _astream_on_replica if response.is_async else _stream_on_replica
+            response.streaming_content = wrap(response.streaming_content)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in SAFE_METHODS or not replica_enabled() or not _wants_replica(view_func): return None
+        try: pinned = int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError: pinned = False
+        if not pinned:
+            request.use_replica = True
+            _use_replica.set(True)
+        return None
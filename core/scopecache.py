@@ -0,0 +1,92 @@
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+from django.db.models import Q
+from .models import Tugas, path_ancestor_ids
+
+# --- CACHE PAYLOAD GANTT & KALENDER (per scope visibilitas) ---
+# JSON yang sudah diserialisasi disimpan per scope: grup yang bisa diakses + user (tugas grup lain
+# yang ditugaskan ke dia) + parameter filter. Key memuat generation tiap grup di scope itu, jadi
+# perubahan di satu divisi hanya membuat basi cache yang memang bisa melihatnya. Cache hit tidak
+# menyentuh ORM: daftar grup (access cache), generation, dan payload semuanya dari cache.
+# Generation dinaikkan setelah commit agar pembaca tidak menyimpan ulang data lama di key baru.
+# Key memuat alias DB yang dibaca: entri dari replica (bisa tertinggal) tidak pernah dipakai request
+# yang menempel ke primary; umurnya bagi pembaca replica dibatasi PAYLOAD_TIMEOUT.
+# Tanpa cache bersama (settings.CACHE_SHARED) payload selalu dibangun ulang.
+
+PAYLOAD_TIMEOUT = 600
+EPOCH_KEY = 'scope:epoch'  # update massal tanpa info grup (sweeper, import, BAU): semua scope basi
+
+
+def shared_cache():
+    """True jika backend cache dibagi semua proses, sehingga invalidasi dari proses mana pun terlihat."""
+    return getattr(settings, 'CACHE_SHARED', False)
+
+
+def _group_key(group_id): return f"scope:g{group_id}"
+def _user_key(user_id): return f"scope:u{user_id}"
+
+
+def _bump(keys):
+    # Key yang hilang (evict) diisi nilai unik berbasis waktu, tidak pernah kembali ke nilai lama
+    for key in keys:
+        try: cache.incr(key)
+        except ValueError: cache.add(key, time.time_ns(), None)
+
+
+async def _agenerations(keys):
+    gens = await cache.aget_many(keys)
+    for key in keys:
+        if key not in gens:
+            await cache.aadd(key, time.time_ns(), None)
+            gens[key] = await cache.aget(key)
+    return [gens[k] for k in keys]
+
+
+async def acached_json(kind, user, group_ids, params, build):
+    """Body JSON untuk scope user; `build` (coroutine function) hanya dipanggil saat cache miss."""
+    if not shared_cache(): return json.dumps(await build(), cls=DjangoJSONEncoder)
+    keys = [EPOCH_KEY] + [_group_key(g) for g in sorted(group_ids)]
+    if not user.is_superuser: keys.append(_user_key(user.pk))
+    raw = f"{kind}|{router.db_for_read(Tugas)}|{'all' if user.is_superuser else user.pk}|{sorted(group_ids)}|{sorted(params.items())}|{await _agenerations(keys)}"
+    key = f"payload:{kind}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    body = await cache.aget(key)
+    if body is None:
+        body = json.dumps(await build(), cls=DjangoJSONEncoder)
+        await cache.aset(key, body, PAYLOAD_TIMEOUT)
+    return body
+
+
+# --- INVALIDASI ---
+def invalidate_scopes(groups=(), users=(), projects=(), ancestors=()):
+    """Naikkan generation grup & PIC terdampak setelah commit.
+
+    Bar proyek dan bar induk (roll-up) juga tampil bagi grup lain yang punya tugas di proyek /
+    subtree yang sama, jadi grup & PIC seluruh tugas di `projects` dan leluhur `ancestors` ikut naik.
+    """
+    groups, users = set(groups), set(users)
+    projects, ancestors = {p for p in projects if p}, set(ancestors)
+
+    def bump():
+        if projects or ancestors:
+            for g, u in Tugas.objects.filter(Q(proyek_id__in=projects) | Q(id__in=ancestors)).values_list('pemilik_grup_id', 'ditugaskan_ke_id').distinct():
+                groups.add(g); users.add(u)
+        _bump([_group_key(g) for g in groups if g] + [_user_key(u) for u in users if u])
+    transaction.on_commit(bump)
+
+
+def invalidate_tasks(ids):
+    """invalidate_scopes() untuk tugas yang diubah lewat update()/bulk_update (tanpa post_save)."""
+    groups, users, projects, ancestors = set(), set(), set(), set()
+    for g, u, p, jalur in Tugas.objects.filter(id__in=list(ids)).values_list('pemilik_grup_id', 'ditugaskan_ke_id', 'proyek_id', 'jalur'):
+        groups.add(g); users.add(u); projects.add(p); ancestors.update(path_ancestor_ids(jalur))
+    invalidate_scopes(groups, users, projects, ancestors)
+
+
+def invalidate_all():
+    transaction.on_commit(lambda: _bump([EPOCH_KEY]))
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User, Group
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .access import bump_version
+from .models import Proyek, Tugas, UserProfile, apply_rollup, path_ancestor_ids
+from .scopecache import invalidate_scopes, invalidate_all
+from .stats import bump_generation
+
+# --- CACHE INVALIDATION ---
+@receiver([post_save, post_delete], sender=Tugas)
+@receiver([post_save, post_delete], sender=Proyek)
+def invalidate_dashboard_stats(sender, **kwargs):
+    bump_generation(scopes=False)
+
+@receiver([post_save, post_delete], sender=Tugas)
+def invalidate_task_scopes(sender, instance, **kwargs):
+    # Grup/PIC/induk lama (snapshot saat dimuat) dan baru; update tanpa snapshot -> semua scope
+    old = getattr(instance, '_scope_state', None)
+    if old is None and kwargs.get('created') is False: invalidate_all(); return
+    if kwargs.get('signal') is post_delete: path = instance.jalur
+    else: path = f"{instance.induk.jalur if instance.induk_id else ''}{instance.pk}/"  # jalur baru (diisi setelah post_save)
+    states = [(instance.pemilik_grup_id, instance.ditugaskan_ke_id, instance.proyek_id, path)] + ([old] if old else [])
+    invalidate_scopes({s[0] for s in states}, {s[1] for s in states}, {s[2] for s in states}, {i for s in states for i in path_ancestor_ids(s[3])})
+    instance._scope_state = states[0]
+
+@receiver([post_save, post_delete], sender=Proyek)
+def invalidate_project_scopes(sender, instance, **kwargs):
+    invalidate_scopes(projects=[instance.pk])
+
+@receiver(pre_save, sender=User)
+def remember_superuser_flag(sender, instance, update_fields=None, **kwargs):
+    # Save parsial lain (mis. last_login saat login) tidak perlu dicek
+    if instance.pk and (update_fields is None or 'is_superuser' in update_fields):
+        instance._was_superuser = User.objects.filter(pk=instance.pk).values_list('is_superuser', flat=True).first()
+
+@receiver(post_save, sender=User)
+def invalidate_access_on_superuser(sender, instance, created, **kwargs):
+    # Status superuser mengubah seluruh scope yang bisa dilihat user tsb
+    if not created and getattr(instance, '_was_superuser', instance.is_superuser) != instance.is_superuser: bump_version()
+
+@receiver(pre_save, sender=UserProfile)
+def remember_role(sender, instance, update_fields=None, **kwargs):
+    # create_or_update_user_profile menyimpan ulang profil di SETIAP save User (termasuk last_login
+    # saat login); hanya perubahan role yang boleh membuat basi cache akses semua user
+    if instance.pk and (update_fields is None or 'role' in update_fields):
+        instance._old_role = UserProfile.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_access_on_role(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_old_role', instance.role) != instance.role: bump_version()
+    instance._old_role = instance.role
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(post_delete, sender=UserProfile)
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_access_cache(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'): bump_version()
+
+# --- ROLL-UP PROGRESS ---
+@receiver(post_delete, sender=Tugas)
+def rollup_on_delete(sender, instance, **kwargs):
+    # Tiap tugas yang terhapus (termasuk anggota subtree) mengurangi leluhur & proyeknya sendiri
+    apply_rollup({i: (-instance.progress, -1) for i in path_ancestor_ids(instance.jalur)}, {instance.proyek_id: (-instance.progress, -1)})
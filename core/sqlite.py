@@ -0,0 +1,30 @@
+from django.conf import settings
+
+# --- SQLITE PRODUCTION PROFILE ---
+# Hanya jika settings.SQLITE_PRODUCTION_PROFILE aktif: settings.SQLITE_PRAGMAS dipasang lewat
+# sinyal connection_created (lihat CoreConfig.ready) untuk setiap koneksi SQLite:
+#   - journal_mode=WAL    : pembaca tidak memblokir penulis (dan sebaliknya) antar worker gunicorn
+#   - synchronous=NORMAL  : fsync hanya saat checkpoint; aman dari korupsi dengan WAL
+#   - busy_timeout        : tunggu lock alih-alih langsung "database is locked" (= SQLITE_TIMEOUT)
+#   - mmap_size/cache_size: baca halaman lewat memory map + page cache lebih besar
+# Transaksi penulis memakai BEGIN IMMEDIATE (OPTIONS transaction_mode alias 'default' di settings)
+# sehingga lock tulis diambil di awal transaksi dan busy_timeout benar-benar berlaku.
+
+def sqlite_timeout():
+    return getattr(settings, 'SQLITE_TIMEOUT', 5)
+
+
+def sqlite_pragmas():
+    # busy_timeout tidak di-set terpisah: selalu sama dengan timeout koneksi
+    return {**getattr(settings, 'SQLITE_PRAGMAS', {}), 'busy_timeout': int(sqlite_timeout() * 1000)}
+
+
+def apply_pragmas(conn, pragmas):
+    """Jalankan PRAGMA di koneksi DB-API sqlite3 mentah (tidak tercatat di query log Django)."""
+    for name, value in pragmas.items():
+        conn.execute(f'PRAGMA {name}={value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_PRODUCTION_PROFILE', False): return
+    apply_pragmas(connection.connection, sqlite_pragmas())
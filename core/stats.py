@@ -0,0 +1,87 @@
+import hashlib
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import router
+from django.db.models import Count, Q
+from .models import Tugas
+from .scopecache import invalidate_all, shared_cache
+
+# --- DASHBOARD AGGREGATION ENGINE ---
+# Semua counter status + matriks PIC x status dihitung dalam SATU query GROUP BY,
+# lalu hasilnya di-cache per scope visibilitas dan alias DB yang dibaca (lihat get_dashboard_stats).
+
+STATS_TIMEOUT = 300
+GENERATION_KEY = 'stats:generation'
+STATUS_KEYS = [s for s, _ in Tugas.STATUS_CHOICES]
+
+
+def get_generation():
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        cache.add(GENERATION_KEY, 1, None)
+        gen = cache.get(GENERATION_KEY, 1)
+    return gen
+
+
+def bump_generation(scopes=True):
+    # Dipanggil dari signal Tugas/Proyek; semua entry lama otomatis tidak terpakai lagi.
+    # scopes=True (update massal) ikut membuat basi semua cache payload Gantt/kalender;
+    # pemanggil yang tahu tugas mana yang berubah memakai invalidasi per grup (scopecache).
+    try: cache.incr(GENERATION_KEY)
+    except ValueError: cache.add(GENERATION_KEY, 1, None)
+    if scopes: invalidate_all()
+
+
+def scope_key(user, group_ids):
+    if user.is_superuser: return 'all'
+    raw = ','.join(str(g) for g in sorted(group_ids))
+    return f"u{user.pk}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def _empty_counts():
+    counts = {s: 0 for s in STATUS_KEYS}
+    counts['total'] = 0
+    return counts
+
+
+def compute_stats(tasks, projects):
+    status_aggs = {s: Count('id', filter=Q(status=s)) for s in STATUS_KEYS}
+    rows = tasks.order_by().values('ditugaskan_ke_id').annotate(total=Count('id'), **status_aggs)
+
+    totals = _empty_counts()
+    matrix = {}
+    for row in rows:
+        assignee = row.pop('ditugaskan_ke_id')
+        matrix[assignee] = row
+        for k, v in row.items(): totals[k] += v
+
+    names = {u['id']: u['first_name'] or u['username'] for u in User.objects.filter(pk__in=[a for a in matrix if a]).values('id', 'first_name', 'username')}
+    return {'totals': totals, 'matrix': matrix, 'names': names, 'total_projects': projects.count()}
+
+
+def get_dashboard_stats(user, group_ids, tasks, projects):
+    """Ambil statistik dashboard dari cache; hitung ulang jika generation sudah berubah."""
+    if not shared_cache(): return compute_stats(tasks, projects)
+    key = f"stats:dashboard:{get_generation()}:{router.db_for_read(Tugas)}:{scope_key(user, group_ids)}"
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(tasks, projects)
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def workload_rows(stats):
+    # Matriks PIC x status dalam bentuk list siap render (urut sesuai STATUS_CHOICES)
+    rows = []
+    for assignee, counts in stats['matrix'].items():
+        name = stats['names'].get(assignee, 'Unassigned') if assignee else 'Unassigned'
+        rows.append({'assignee_id': assignee, 'name': name, 'total': counts['total'], 'counts': [counts[s] for s in STATUS_KEYS]})
+    rows.sort(key=lambda r: (-r['total'], r['name']))
+    return rows
+
+
+def counts_for(stats, assignee_id=None):
+    if not assignee_id: return stats['totals']
+    try: assignee_id = int(assignee_id)
+    except (TypeError, ValueError): return _empty_counts()
+    return stats['matrix'].get(assignee_id) or _empty_counts()
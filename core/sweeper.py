@@ -0,0 +1,46 @@
+from datetime import timedelta
+from django.db.models import F
+from django.utils import timezone
+from .audit import audited_atomic, log_activity
+from .models import Tugas, Watermark
+from .stats import bump_generation
+
+# --- OVERDUE SWEEPER ---
+# Satu UPDATE berbasis set per run (index tugas_tenggat_idx), bukan save() per objek.
+# Watermark = tanggal run terakhir; run inkremental hanya menyentuh tugas yang tenggatnya
+# lewat sejak watermark itu. Tugas yang tenggatnya digeser ke masa lalu, atau keluar dari
+# ON_HOLD dengan tenggat yang sudah lewat, tidak tertangkap run inkremental -- karena itu
+# sekali setiap FULL_SWEEP_DAYS hari (mingguan) satu run otomatis memeriksa semua tugas.
+
+WATERMARK_NAME = 'overdue'
+FULL_WATERMARK_NAME = 'overdue:full'
+FULL_SWEEP_DAYS = 7
+SKIP_STATUSES = ('DONE', 'DROP', 'ON_HOLD', 'OVERDUE')
+
+
+def get_watermark(name=WATERMARK_NAME):
+    return Watermark.objects.filter(name=name).values_list('value', flat=True).first()
+
+
+def set_watermark(name, value):
+    Watermark.objects.update_or_create(name=name, defaults={'value': value})
+
+
+def sweep_overdue(today=None, full=False):
+    """Tandai OVERDUE tugas yang lewat tenggat; return (jumlah, watermark sebelumnya; None = run penuh)."""
+    today = today or timezone.localdate()
+    with audited_atomic():
+        last_full = get_watermark(FULL_WATERMARK_NAME)
+        full = full or last_full is None or last_full <= today - timedelta(days=FULL_SWEEP_DAYS)
+        since = None if full else get_watermark()
+        qs = Tugas.objects.filter(tenggat_waktu__lt=today).exclude(status__in=SKIP_STATUSES)
+        if since: qs = qs.filter(tenggat_waktu__gte=since)
+        count = qs.update(status='OVERDUE', versi=F('versi') + 1)
+        set_watermark(WATERMARK_NAME, today)
+        if since is None: set_watermark(FULL_WATERMARK_NAME, today)
+
+        if count:
+            # Satu entri ringkasan untuk seluruh batch
+            log_activity(None, 'UPDATE', 'Tugas', 'OVERDUE-SWEEP', f"Auto OVERDUE: {count} tugas (tenggat {since or 'awal'} s/d {today})")
+    if count: bump_generation()  # update() tidak memicu post_save
+    return count, since
@@ -0,0 +1,507 @@
+import io
+import unittest
+from unittest import mock
+from datetime import date
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from .audit import audited_atomic, log_activity
+from .batch import apply_batch, fast_update, load_state
+from .dag import CycleError, load_graph, reschedule_many, would_cycle
+from .bau import generate_bau
+from .importer import MAX_STORED_ERRORS, TaskImporter
+from .management.commands.check_query_plans import FULL_SCAN
+from .models import AuditLog, CodeSequence, Proyek, TemplateBAU, Tugas, compute_rollup
+
+
+@override_settings(CACHE_SHARED=True)
+class GanttQueryCountTests(TestCase):
+    """Jumlah query gantt_data konstan, tidak tumbuh dengan jumlah proyek/tugas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.user = User.objects.create_user('pic', password='pw')
+        cls.user.groups.add(cls.group)
+        cls.add_project('P1')
+
+    @classmethod
+    def add_project(cls, name):
+        p = Proyek.objects.create(nama_proyek=name, tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=cls.group)
+        parent = Tugas.objects.create(nama_tugas=f'{name} induk', proyek=p, tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=cls.group, ditugaskan_ke=cls.user)
+        Tugas.objects.create(nama_tugas=f'{name} anak', induk=parent, tanggal_mulai=date(2025, 2, 11), tenggat_waktu=date(2025, 2, 13), pemilik_grup=cls.group, ditugaskan_ke=cls.user, progress=50)
+        return p
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_gantt(self):
+        response = self.client.get('/gantt-data/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cold_request_query_count(self):
+        # session + user + resolver akses (grup, role) + tugas + proyek
+        with self.assertNumQueries(6):
+            rows = self.get_gantt()
+        self.assertEqual([r['name'] for r in rows], ['📁 P1', 'P1 induk', 'P1 anak'])
+        self.assertEqual(rows[1]['progress'], 50)  # roll-up dari subtask
+
+    def test_query_count_independent_of_size(self):
+        for i in range(2, 6): self.add_project(f'P{i}')
+        with self.assertNumQueries(6):
+            rows = self.get_gantt()
+        self.assertEqual(len(rows), 15)
+
+    def test_cached_payload_skips_task_queries(self):
+        self.get_gantt()
+        # Hanya session + user; resolver akses & payload dari cache
+        with self.assertNumQueries(2):
+            self.get_gantt()
+
+    @override_settings(CACHE_SHARED=False)
+    def test_process_local_cache_is_not_reused(self):
+        # LocMem per proses tidak melihat invalidasi dari proses lain: payload selalu dibangun ulang
+        self.get_gantt()
+        with self.assertNumQueries(6):  # session + user + resolver akses (grup, role) + tugas + proyek
+            self.get_gantt()
+
+
+class AccessVersionTests(TestCase):
+    """Version cache akses hanya naik saat membership grup atau role berubah."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('mem', password='pw')
+
+    def assertVersionBumped(self, bumped, action):
+        from .access import get_version
+        before = get_version()
+        action()
+        self.assertEqual(get_version() != before, bumped)
+
+    def test_login_and_profile_edits_keep_version(self):
+        self.assertVersionBumped(False, lambda: self.client.login(username='mem', password='pw'))
+        self.user.first_name = 'Mem'
+        self.assertVersionBumped(False, self.user.save)
+
+    def test_role_and_group_changes_bump_version(self):
+        profile = self.user.profile
+        profile.role = 'ADMIN'
+        self.assertVersionBumped(True, profile.save)
+        self.assertVersionBumped(True, lambda: self.user.groups.add(Group.objects.create(name='OTHER')))
+
+
+
+class TaskApiVersionTests(TestCase):
+    """API per-tugas: versi basi -> 409 dengan state terkini, tanpa menulis apa pun."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.user = User.objects.create_user('pic', password='pw')
+        cls.user.groups.add(cls.group)
+        p = Proyek.objects.create(nama_proyek='P1', tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=cls.group)
+        cls.task = Tugas.objects.create(nama_tugas='T1', proyek=p, tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=cls.group, ditugaskan_ke=cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.v = Tugas.objects.values_list('versi', flat=True).get(pk=self.task.pk)  # save() menaikkan versi
+
+    def post(self, action, **data):
+        return self.client.post(f'/api/task/{self.task.pk}/{action}/', data, content_type='application/json')
+
+    def test_progress_with_current_version(self):
+        response = self.post('update-progress', progress=40, version=self.v)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['task']['version'], self.v + 1)
+        self.assertEqual(Tugas.objects.values_list('progress', 'status', 'versi').get(pk=self.task.pk), (40, 'IN_PROGRESS', self.v + 1))
+
+    def test_stale_progress_version_returns_conflict(self):
+        self.post('update-progress', progress=40, version=self.v)
+        response = self.post('update-progress', progress=90, version=self.v)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.json()['task']['progress'], response.json()['task']['version']), (40, self.v + 1))
+        self.assertEqual(Tugas.objects.values_list('progress', 'versi').get(pk=self.task.pk), (40, self.v + 1))
+
+    def test_stale_date_version_returns_conflict(self):
+        self.post('update-progress', progress=40, version=self.v)
+        response = self.post('update-date', start='2025-02-11', end='2025-02-12', version=self.v)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['task']['start'], '2025-02-10')
+        self.assertEqual(Tugas.objects.get(pk=self.task.pk).tanggal_mulai, date(2025, 2, 10))
+
+    def test_progress_out_of_range_is_rejected(self):
+        for prog in (-1, 101):
+            self.assertEqual(self.post('update-progress', progress=prog, version=self.v).status_code, 400)
+        self.assertEqual(Tugas.objects.values_list('progress', 'versi').get(pk=self.task.pk), (0, self.v))
+
+
+class ApplyBatchTests(TestCase):
+    """apply_batch: hasil per item, konflik parsial tidak menggagalkan item lain, id ganda digabung."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.user = User.objects.create_user('pic', password='pw')
+        cls.other = User.objects.create_user('oth', password='pw')
+        p = Proyek.objects.create(nama_proyek='P1', tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=cls.group)
+        cls.a, cls.b, cls.c = [
+            Tugas.objects.create(nama_tugas=name, proyek=p, tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=cls.group, ditugaskan_ke=owner)
+            for name, owner in [('A', cls.user), ('B', cls.user), ('C', cls.other)]
+        ]
+
+    def apply(self, changes):
+        return apply_batch(self.user, changes, lambda t: t.ditugaskan_ke_id == self.user.id)[0]
+
+    def state(self, t):
+        return Tugas.objects.values_list('progress', 'status', 'versi').get(pk=t.pk)
+
+    def test_results_per_item(self):
+        a, b = self.state(self.a), self.state(self.b)
+        results = self.apply([
+            {'id': self.a.pk, 'progress': 30},
+            {'id': self.b.pk, 'progress': 150},
+            {'id': self.c.pk, 'progress': 10},
+            {'id': 999999, 'progress': 10},
+            'bukan dict',
+        ])
+        self.assertEqual(results[0], {'id': self.a.pk, 'status': 'success', 'new_status': 'Sedang Dikerjakan', 'version': a[2] + 1})
+        self.assertEqual(results[1], {'id': self.b.pk, 'error': 'Progress harus 0-100'})
+        self.assertEqual(results[2], {'id': self.c.pk, 'error': 'Permission denied'})
+        self.assertEqual([r['error'] for r in results[3:]], ['Tugas tidak ditemukan'] * 2)
+        self.assertEqual(self.state(self.a), (30, 'IN_PROGRESS', a[2] + 1))
+        self.assertEqual(self.state(self.b), b)
+
+    def test_partial_conflict_keeps_other_items(self):
+        a, b = self.state(self.a), self.state(self.b)
+        results = self.apply([{'id': self.a.pk, 'version': a[2] - 1, 'progress': 30}, {'id': self.b.pk, 'version': b[2], 'progress': 60}])
+        self.assertEqual(results[0]['error'], 'Tugas sudah diubah pengguna lain. Muat ulang halaman.')
+        self.assertEqual(results[0]['task']['version'], a[2])
+        self.assertEqual(results[1]['status'], 'success')
+        self.assertEqual(self.state(self.a), a)
+        self.assertEqual(self.state(self.b), (60, 'IN_PROGRESS', b[2] + 1))
+
+    def test_duplicate_ids_are_applied_in_order_once(self):
+        a = self.state(self.a)
+        results = self.apply([
+            {'id': self.a.pk, 'version': a[2], 'progress': 100},
+            {'id': self.a.pk, 'version': a[2], 'status': 'DONE'},
+            {'id': self.a.pk, 'version': a[2], 'progress': 101},
+        ])
+        self.assertEqual([r.get('status') for r in results], ['success', 'success', None])
+        self.assertEqual(results[2]['error'], 'Progress harus 0-100')
+        # Satu baris ditulis sekali: versi naik satu, item gagal tidak membatalkan perubahan sebelumnya
+        self.assertEqual(self.state(self.a), (100, 'DONE', a[2] + 1))
+
+    def test_batch_api(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/api/task/batch/', {'changes': [{'id': self.a.pk, 'progress': 20}, {'id': self.c.pk, 'progress': 20}]}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r.get('status', r.get('error')) for r in response.json()['results']], ['success', 'Permission denied'])
+        self.assertEqual(self.client.post('/api/task/batch/', {'changes': []}, content_type='application/json').status_code, 400)
+
+
+class AuditedAtomicTests(TestCase):
+    """Audit log ditulis di akhir blok, di transaksi yang sama dengan perubahannya."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+
+    def create_project(self, name):
+        return Proyek.objects.create(nama_proyek=name, tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=self.group)
+
+    def test_entries_written_with_one_insert_before_commit(self):
+        with self.assertNumQueries(3):  # savepoint + satu INSERT + release
+            with audited_atomic():
+                for i in range(3): log_activity(None, 'UPDATE', 'Tugas', f'T-{i}', 'x')
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_rollback_discards_entries(self):
+        with self.assertRaises(ValueError), audited_atomic():
+            self.create_project('P1')
+            log_activity(None, 'CREATE', 'Proyek', 'P1', 'x')
+            raise ValueError
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertFalse(Proyek.objects.exists())
+
+    def test_savepoint_rollback_discards_its_entry(self):
+        with audited_atomic():
+            log_activity(None, 'CREATE', 'Tugas', 'ok', 'x')
+            with self.assertRaises(ValueError), transaction.atomic():
+                log_activity(None, 'CREATE', 'Tugas', 'batal', 'x')
+                raise ValueError
+        self.assertEqual(list(AuditLog.objects.values_list('target_id', flat=True)), ['ok'])
+
+    def test_flush_failure_rolls_back_change(self):
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=DatabaseError), self.assertRaises(DatabaseError), audited_atomic():
+            self.create_project('P1')
+            log_activity(None, 'CREATE', 'Proyek', 'P1', 'x')
+        self.assertFalse(Proyek.objects.exists())
+
+
+class TaskImporterTests(TestCase):
+    """Induk dicari di DB per chunk; baris import ini menang atas tugas lama bernama sama."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.user = User.objects.create_user('pic', password='pw')
+        cls.old = Tugas.objects.create(nama_tugas='Main', tipe_tugas='ADHOC', tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=cls.group)
+
+    def run_import(self, rows, chunk_size=2):
+        importer = TaskImporter(self.user, self.group.pk)
+        importer.import_stream(enumerate(rows, start=2), chunk_size=chunk_size)
+        return importer
+
+    def row(self, name, level=1, parent=''):
+        return (name, 'ADHOC', '', '', '', '2025-02-10', '2025-02-12', '', level, parent)
+
+    def parent_of(self, name):
+        return Tugas.objects.filter(nama_tugas=name).values_list('induk__nama_tugas', 'induk_id').get()
+
+    def test_parents_across_chunks_and_forward_references(self):
+        importer = self.run_import([
+            self.row('Sub maju', 2, 'Main'),  # induk baru muncul di chunk berikutnya
+            self.row('Lain'),
+            self.row('Main'),
+            self.row('Isi'),
+            self.row('Sub mundur', 2, 'Main'),  # induk dari chunk sebelumnya
+            self.row('Sub lama', 2, 'Hilang'),
+        ])
+        new_main = Tugas.objects.filter(nama_tugas='Main').exclude(pk=self.old.pk).get()
+        self.assertEqual(self.parent_of('Sub maju'), ('Main', new_main.pk))
+        self.assertEqual(self.parent_of('Sub mundur'), ('Main', new_main.pk))
+        self.assertEqual((importer.success_count, importer.errors), (5, ["Baris 7 (Sub lama): Tugas Induk 'Hilang' tidak ditemukan."]))
+
+    def test_existing_parent_used_when_not_in_file(self):
+        self.run_import([self.row('Sub', 2, 'Main')])
+        self.assertEqual(self.parent_of('Sub'), ('Main', self.old.pk))
+
+    def test_errors_are_counted_but_only_first_messages_kept(self):
+        importer = self.run_import([self.row(f'Sub {i}', 2) for i in range(MAX_STORED_ERRORS + 5)], chunk_size=50)
+        self.assertEqual((importer.error_count, len(importer.errors), importer.rows_done), (MAX_STORED_ERRORS + 5, MAX_STORED_ERRORS, MAX_STORED_ERRORS + 5))
+
+
+class GenerateBauTests(TestCase):
+    """generate_bau idempoten; jumlah yang dilaporkan = baris yang benar-benar dimasukkan run ini."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.tmpl = TemplateBAU.objects.create(nama_tugas='Laporan', frekuensi='MONTHLY', pemilik_grup=cls.group)
+
+    def test_second_run_creates_nothing(self):
+        self.assertEqual(generate_bau(date(2025, 1, 1), date(2025, 3, 31)), 3)
+        self.assertEqual(generate_bau(date(2025, 1, 1), date(2025, 3, 31)), 0)
+        self.assertEqual(Tugas.objects.filter(template_bau=self.tmpl).count(), 3)
+
+    def test_overlapping_run_counts_only_own_rows(self):
+        reserve = Tugas.reserve_codes
+
+        def race(induk_id, count):
+            # Host lain menyisipkan occurrence Februari setelah cek "sudah ada" run ini
+            first = reserve(induk_id, count)
+            Tugas.objects.bulk_create([Tugas(kode_tugas='LAIN-1', nama_tugas='Laporan (Feb-2025)', tipe_tugas='BAU', tanggal_mulai=date(2025, 2, 1), tenggat_waktu=date(2025, 2, 28), pemilik_grup=self.group, template_bau=self.tmpl, periode=date(2025, 2, 1))])
+            return first
+
+        with mock.patch.object(Tugas, 'reserve_codes', side_effect=race):
+            self.assertEqual(generate_bau(date(2025, 1, 1), date(2025, 3, 31)), 2)
+        self.assertEqual(Tugas.objects.filter(template_bau=self.tmpl).count(), 3)
+        self.assertEqual(AuditLog.objects.get().details, 'Generate BAU: 2 tugas (2025-01-01 s/d 2025-03-31)')
+
+
+class RollupInvariantTests(TestCase):
+    """Agregat roll-up yang dirawat per delta harus selalu sama dengan hitung ulang dari nol."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.user = User.objects.create_user('pic', password='pw')
+        cls.p1, cls.p2 = [Proyek.objects.create(nama_proyek=name, tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=cls.group) for name in ('P1', 'P2')]
+        cls.root = cls.task('Root', proyek=cls.p1)
+        cls.child = cls.task('Child', induk=cls.root, progress=40)
+        cls.grandchild = cls.task('Grandchild', induk=cls.child, progress=80)
+        cls.other = cls.task('Other', proyek=cls.p2, progress=10)
+
+    @classmethod
+    def task(cls, name, **fields):
+        return Tugas.objects.create(nama_tugas=name, tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=cls.group, ditugaskan_ke=cls.user, **fields)
+
+    def assertRollupConsistent(self):
+        task_totals, project_totals = compute_rollup(Tugas.objects.all())
+        for model, totals, fields in ((Tugas, task_totals, ('rollup_total', 'rollup_count')), (Proyek, project_totals, ('progress_total', 'progress_count'))):
+            for pk, *stored in model.objects.values_list('id', *fields):
+                self.assertEqual(tuple(stored), totals.get(pk, (0, 0)), f"{model.__name__} {pk}")
+
+    def test_create(self):
+        self.assertRollupConsistent()
+        self.assertEqual(Tugas.objects.values_list('rollup_total', 'rollup_count').get(pk=self.root.pk), (120, 2))
+
+    def test_move_subtree(self):
+        child = Tugas.objects.get(pk=self.child.pk)
+        child.induk = self.other
+        child.save()
+        self.assertRollupConsistent()
+
+    def test_stale_instance_save(self):
+        # Instance dimuat sebelum penulis lain mengubah progress & subtree-nya
+        child = Tugas.objects.get(pk=self.child.pk)
+        fast_update(load_state(self.child.pk), None, progress=70, status='IN_PROGRESS')
+        grandchild = Tugas.objects.get(pk=self.grandchild.pk)
+        grandchild.progress = 20
+        grandchild.save()
+        child.progress, child.induk = 50, self.other
+        child.save()
+        self.assertRollupConsistent()
+
+    def test_delete_subtree(self):
+        Tugas.objects.get(pk=self.child.pk).descendants(include_self=True).delete()
+        self.assertRollupConsistent()
+
+    def test_fast_path(self):
+        fast_update(load_state(self.grandchild.pk), None, progress=100, status='DONE')
+        self.assertRollupConsistent()
+
+    def test_batch(self):
+        apply_batch(self.user, [{'id': self.child.pk, 'progress': 90}, {'id': self.grandchild.pk, 'progress': 5}, {'id': self.child.pk, 'progress': 60}], lambda t: True)
+        self.assertRollupConsistent()
+
+    def test_import(self):
+        importer = TaskImporter(self.user, self.group.pk)
+        importer.import_stream(enumerate([
+            ('Sub impor', 'ADHOC', '', '', '', '2025-02-10', '2025-02-12', '', 2, 'Child'),
+            ('Root impor', 'PROJECT', 'P-001', '', '', '2025-02-10', '2025-02-12', '', 1, ''),
+        ], start=2))
+        self.assertEqual(importer.errors, [])
+        self.assertRollupConsistent()
+
+    def test_rebuild_rollup_repairs_drift(self):
+        Tugas.objects.filter(pk=self.root.pk).update(rollup_total=0)
+        Proyek.objects.filter(pk=self.p2.pk).update(progress_count=7)
+        out = io.StringIO()
+        call_command('rebuild_rollup', stdout=out)
+        self.assertIn('2 baris', out.getvalue())
+        self.assertRollupConsistent()
+
+
+class DependencyGraphTests(TestCase):
+    """Graf dependensi: jadwal/slack, geser berantai, dan penolakan siklus."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='RISK PROCESS CONTROL')
+        cls.proyek = Proyek.objects.create(nama_proyek='P1', tanggal_mulai=date(2025, 2, 10), tanggal_selesai=date(2025, 3, 10), pemilik_grup=cls.group)
+        # a (Sen-Rab) -> b (Kam-Jum) -> c (Sen); d paralel dengan slack
+        cls.a = cls.task('A', date(2025, 2, 10), date(2025, 2, 12))
+        cls.b = cls.task('B', date(2025, 2, 13), date(2025, 2, 14), cls.a)
+        cls.c = cls.task('C', date(2025, 2, 17), date(2025, 2, 17), cls.b)
+        cls.d = cls.task('D', date(2025, 2, 10), date(2025, 2, 11))
+
+    @classmethod
+    def task(cls, name, start, end, dep=None):
+        return Tugas.objects.create(nama_tugas=name, proyek=cls.proyek, tanggal_mulai=start, tenggat_waktu=end, pemilik_grup=cls.group, tergantung_pada=dep)
+
+    def dates(self, *tasks):
+        return [Tugas.objects.values_list('tanggal_mulai', 'tenggat_waktu').get(pk=t.pk) for t in tasks]
+
+    def test_schedule_critical_and_slack(self):
+        schedule = load_graph(self.a).schedule()
+        self.assertEqual({i for i, s in schedule.items() if s['critical']}, {self.a.pk, self.b.pk, self.c.pk})
+        self.assertEqual(schedule[self.d.pk]['slack'], 4)
+
+    def test_cascade_shifts_chain_over_weekend(self):
+        graph = load_graph(self.a)
+        graph.nodes[self.a.pk]['tenggat_waktu'] = date(2025, 2, 13)
+        self.assertEqual(graph.cascade(self.a.pk), {
+            self.b.pk: (date(2025, 2, 14), date(2025, 2, 17)),
+            self.c.pk: (date(2025, 2, 18), date(2025, 2, 18)),
+        })
+
+    def test_cascade_leaves_non_overlapping_successors(self):
+        graph = load_graph(self.b)
+        self.assertEqual(graph.cascade(self.a.pk), {})
+
+    def test_reschedule_many_writes_and_bumps_version(self):
+        versions = dict(Tugas.objects.values_list('id', 'versi'))
+        Tugas.objects.filter(pk=self.a.pk).update(tenggat_waktu=date(2025, 2, 13))
+        shifted = reschedule_many([Tugas(pk=self.a.pk, proyek_id=self.proyek.pk), Tugas(pk=self.d.pk, proyek_id=self.proyek.pk)])
+        self.assertEqual(set(shifted), {self.b.pk, self.c.pk})
+        self.assertEqual(self.dates(self.b, self.c), [(date(2025, 2, 14), date(2025, 2, 17)), (date(2025, 2, 18), date(2025, 2, 18))])
+        self.assertEqual([Tugas.objects.get(pk=t.pk).versi - versions[t.pk] for t in (self.b, self.c, self.d)], [1, 1, 0])
+
+    def test_would_cycle(self):
+        self.assertTrue(would_cycle(self.a, self.c.pk))
+        self.assertFalse(would_cycle(self.d, self.c.pk))
+        a = Tugas.objects.get(pk=self.a.pk)
+        a.tergantung_pada = self.c
+        with self.assertRaisesMessage(ValidationError, 'siklus'):
+            a.clean()
+
+    def test_existing_cycle_is_not_rescheduled(self):
+        Tugas.objects.filter(pk=self.a.pk).update(tergantung_pada=self.c)
+        with self.assertRaises(CycleError):
+            load_graph(self.a).topological_order()
+        self.assertEqual(reschedule_many([Tugas(pk=self.a.pk, proyek_id=self.proyek.pk)]), {})
+
+
+class CodeSequenceTests(TestCase):
+    """Reservasi blok nomor: berurutan, tanpa celah maupun duplikat antar pemanggilan."""
+
+    def test_blocks_are_contiguous_without_gaps_or_duplicates(self):
+        numbers = []
+        for count in (5, 1, 3, 10, 1):
+            first = CodeSequence.reserve('seq', count)
+            numbers.extend(range(first, first + count))
+        self.assertEqual(numbers, list(range(1, 21)))
+        self.assertEqual(CodeSequence.objects.get(name='seq').value, 20)
+
+    def test_sequences_are_independent(self):
+        self.assertEqual([CodeSequence.reserve('a', 2), CodeSequence.reserve('b', 2), CodeSequence.reserve('a', 2)], [1, 1, 3])
+
+    def test_seed_only_used_for_new_counter(self):
+        self.assertEqual(CodeSequence.reserve('seq', 2, seed=lambda: 10), 11)
+        self.assertEqual(CodeSequence.reserve('seq', 2, seed=lambda: 100), 13)
+
+    def test_counter_created_concurrently(self):
+        # Host lain membuat counter (dan memakai 1-4) di antara UPDATE (0 baris) dan INSERT run ini
+        CodeSequence.objects.create(name='seq', value=4)
+        update = QuerySet.update
+        calls = []
+        def racing_update(qs, **kwargs):
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else update(qs, **kwargs)
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            self.assertEqual(CodeSequence.reserve('seq', 2, seed=lambda: 0), 5)
+        self.assertEqual(CodeSequence.reserve('seq', 1), 7)
+
+    def test_task_codes_continue_from_existing(self):
+        group = Group.objects.create(name='OTHER')
+        make = lambda name, induk=None: Tugas.objects.create(nama_tugas=name, tipe_tugas='ADHOC', induk=induk, tanggal_mulai=date(2025, 2, 10), tenggat_waktu=date(2025, 2, 14), pemilik_grup=group)
+        root = make('A')
+        subs = [make(f'A{i}', root) for i in range(2)]
+        CodeSequence.objects.all().delete()  # counter hilang: di-seed ulang dari kode terbesar
+        self.assertEqual([root.kode_tugas, *[t.kode_tugas for t in subs], make('B').kode_tugas, make('A2', root).kode_tugas], ['T-001', 'T-001.1', 'T-001.2', 'T-002', 'T-001.3'])
+        self.assertEqual(Tugas.reserve_codes(None, 3), 3)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN khusus SQLite')
+class QueryPlanTests(TestCase):
+    """Query hot path harus memakai index; regresi ke full table scan menggagalkan CI."""
+
+    def test_hot_paths_use_indexes(self):
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)  # CommandError jika ada SCAN tanpa index
+        self.assertIn('tidak ada full table scan', out.getvalue())
+
+    def test_detects_full_scan(self):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN SELECT * FROM core_proyek WHERE deskripsi = %s', ['x'])
+            plan = ' | '.join(row[-1] for row in cursor.fetchall())
+        self.assertEqual(FULL_SCAN.findall(plan), ['core_proyek'])
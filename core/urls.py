@@ -26,6 +26,9 @@ urlpatterns = [
     path('users/import/', views.import_user, name='user-import'),
     path('users/import/template/', views.download_template_user, name='user-import-template'),
 
+    # --- BACKGROUND JOB (progress import) ---
+    path('jobs/<int:pk>/', views.job_status, name='job-status'),
+
     # --- GANTT CHART ---
     path('gantt/', views.gantt_view, name='gantt-view'),          
     path('gantt-data/', views.gantt_data, name='gantt-data'),
@@ -38,6 +41,9 @@ urlpatterns = [
     path('bau/<int:pk>/delete/', views.TemplateBAUDeleteView.as_view(), name='bau-delete'),
     path('bau/<int:pk>/trigger/', views.trigger_bau_single, name='trigger-bau'),
 
+    # --- EXPORT DATA (CSV / NDJSON) ---
+    path('export/<str:dataset>/', views.export_data, name='export-data'),
+
     # --- CALENDAR ---
     path('calendar/', views.calendar_view, name='calendar-view'),
     path('calendar-data/', views.calendar_data, name='calendar-data'),
@@ -45,5 +51,7 @@ urlpatterns = [
     # --- API ---
     path('api/task/<int:pk>/update-progress/', views.update_progress_api, name='api-update-progress'),
     path('api/task/<int:pk>/update-date/', views.update_task_date_api, name='api-update-date'),
+    path('api/task/batch/', views.batch_update_api, name='api-task-batch'),
     path('api/get-dates/', views.get_entity_dates_api, name='api-get-dates'),
+    path('api/jobs/<int:pk>/', views.job_status_api, name='api-job-status'),
 ]
\ No newline at end of file
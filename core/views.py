@@ -3,25 +3,33 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, CreateView, UpdateView, DetailView, DeleteView
 from django.urls import reverse_lazy
-from django.http import JsonResponse, HttpResponseForbidden, HttpResponse
-from django.db.models import Q
+from django.http import JsonResponse, HttpResponseForbidden, HttpResponse, StreamingHttpResponse
 from django.contrib import messages
-from django.db import transaction
 import json
+from asgiref.sync import sync_to_async
 from datetime import timedelta, datetime, date
 import openpyxl 
 from openpyxl.styles import Font, PatternFill
 from openpyxl.utils import get_column_letter
 
 # --- IMPORTS MODEL & FORM ---
-from django.contrib.auth.models import User, Group
-from .models import Proyek, Tugas, TemplateBAU, AuditLog, UserProfile
+from django.contrib.auth.models import User
+from .models import Proyek, Tugas, TemplateBAU, BackgroundJob
 from .forms import ProyekForm, TugasForm, ImportTugasForm, ImportUserForm
+from .access import get_accessible_group_ids, get_primary_group, visible_tasks, visible_projects
+from .audit import audited_atomic, log_activity
+from .bau import generate_bau
+from .batch import apply_batch, MAX_BATCH, load_state, fast_update, progress_status, task_state, STATUS_LABELS, VersionConflict
+from .dag import reschedule
+from .exports import stream_xlsx, XLSX_CONTENT_TYPE, EXPORT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS, export_rows, stream_export, streaming_body
+from .filters import apply_task_filters, TASK_FILTER_KEYS
+from .gantt import abuild_gantt_data
+from .jobs import enqueue, job_payload
+from .routers import replica_read
+from .scopecache import acached_json, invalidate_tasks
+from .stats import get_dashboard_stats, counts_for, workload_rows
 
 # --- HELPER & HIERARKI DIVISI ---
-def log_activity(user, action, model_name, obj_id, details):
-    AuditLog.objects.create(user=user, action=action, target_model=model_name, target_id=str(obj_id), details=details)
-
 def get_role(user):
     try: return user.profile.role
     except Exception: return 'MEMBER'
@@ -30,58 +38,47 @@ def is_admin(user): return user.is_superuser or get_role(user) == 'ADMIN'
 def is_leader(user): return get_role(user) == 'LEADER'
 def is_member(user): return get_role(user) == 'MEMBER'
 
-def get_accessible_groups(user):
-    if user.is_superuser: return Group.objects.all()
-    
-    user_groups = list(user.groups.all())
-    group_names = [g.name.upper() for g in user_groups]
-    role = get_role(user)
-    
-    # Hierarki Risk Management
-    if 'RISK MANAGEMENT' in group_names and role == 'ADMIN':
-        sub_groups = Group.objects.filter(name__in=[
-            'RISK PROCESS CONTROL', 'PORTFOLIO MANAGEMENT & GOVERNANCE', 'RISK PRODUCT & DEVELOPMENT'
-        ])
-        user_groups.extend(list(sub_groups))
-        
-    return Group.objects.filter(id__in=[g.id for g in user_groups]).distinct()
-
 class GroupAccessMixin:
     def get_queryset(self):
         qs = super().get_queryset()
         user = self.request.user
         if user.is_superuser: return qs
         
-        accessible_groups = get_accessible_groups(user)
-        if self.model == Tugas:
-            return qs.filter(Q(pemilik_grup__in=accessible_groups) | Q(ditugaskan_ke=user)).distinct()
-        return qs.filter(pemilik_grup__in=accessible_groups).distinct()
+        if self.model == Tugas: return visible_tasks(user, qs)
+        return qs.filter(pemilik_grup_id__in=get_accessible_group_ids(user))
+
+class AuditedWriteMixin:
+    # Simpan/hapus dan audit log-nya satu transaksi: entri ditulis sebelum commit
+    def post(self, request, *args, **kwargs):
+        with audited_atomic(): return super().post(request, *args, **kwargs)
 
+@replica_read
 @login_required
 def dashboard(request):
     user = request.user
+    tasks, projects = visible_tasks(user), visible_projects(user)
     if user.is_superuser:
-        tasks = Tugas.objects.all()
-        projects = Proyek.objects.all()
+        group_ids = []
         team_members = User.objects.all()
     else:
-        accessible_groups = get_accessible_groups(user)
-        tasks = Tugas.objects.filter(Q(pemilik_grup__in=accessible_groups) | Q(ditugaskan_ke=user)).distinct()
-        projects = Proyek.objects.filter(pemilik_grup__in=accessible_groups).distinct()
-        team_members = User.objects.filter(groups__in=accessible_groups).distinct()
+        group_ids = get_accessible_group_ids(user)
+        team_members = User.objects.filter(groups__in=group_ids).distinct()
     
-    assignee_id = request.GET.get('assignee')
-    if assignee_id: tasks = tasks.filter(ditugaskan_ke_id=assignee_id)
+    # Satu query agregat (di-cache per scope); filter assignee diambil dari matriks
+    stats = get_dashboard_stats(user, group_ids, tasks, projects)
+    counts = counts_for(stats, request.GET.get('assignee'))
 
     context = {
-        'total_projects': projects.count(),
-        'total_tasks': tasks.count(),
-        'overdue_tasks': tasks.filter(status='OVERDUE').count(),
-        'in_progress': tasks.filter(status='IN_PROGRESS').count(),
-        'todo_count': tasks.filter(status='TODO').count(),
-        'done_count': tasks.filter(status='DONE').count(),
-        'on_hold_count': tasks.filter(status='ON_HOLD').count(), 
-        'drop_count': tasks.filter(status='DROP').count(),
+        'total_projects': stats['total_projects'],
+        'total_tasks': counts['total'],
+        'overdue_tasks': counts['OVERDUE'],
+        'in_progress': counts['IN_PROGRESS'],
+        'todo_count': counts['TODO'],
+        'done_count': counts['DONE'],
+        'on_hold_count': counts['ON_HOLD'], 
+        'drop_count': counts['DROP'],
+        'status_labels': [label for _, label in Tugas.STATUS_CHOICES],
+        'workload': workload_rows(stats),
         'user_role': get_role(user),
         'team_members': team_members
     }
@@ -90,10 +87,11 @@ def dashboard(request):
 # --- PROYEK VIEWS ---
 class ProyekListView(LoginRequiredMixin, GroupAccessMixin, ListView):
     model = Proyek
+    use_replica = True  # read-only: boleh dibaca dari replica
     template_name = 'core/proyek_list.html'
     context_object_name = 'proyek_list'
 
-class ProyekCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
+class ProyekCreateView(LoginRequiredMixin, UserPassesTestMixin, AuditedWriteMixin, CreateView):
     model = Proyek
     form_class = ProyekForm
     template_name = 'core/proyek_form.html'
@@ -110,18 +108,18 @@ class ProyekCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     
     def form_valid(self, form):
         if not self.request.user.is_superuser:
-            user_group = self.request.user.groups.first()
+            user_group = get_primary_group(self.request.user)
             if not user_group:
                 form.add_error(None, "User tidak punya grup/divisi.")
                 return self.form_invalid(form)
-            form.instance.pemilik_grup = user_group
+            form.instance.pemilik_grup_id = user_group[0]
             
         form.instance.dibuat_oleh = self.request.user
         resp = super().form_valid(form)
         log_activity(self.request.user, 'CREATE', 'Proyek', self.object.kode_proyek, f"Created: {self.object.nama_proyek}")
         return resp
 
-class ProyekUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class ProyekUpdateView(LoginRequiredMixin, UserPassesTestMixin, AuditedWriteMixin, UpdateView):
     model = Proyek
     form_class = ProyekForm
     template_name = 'core/proyek_form.html'
@@ -145,9 +143,10 @@ class ProyekUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
 class ProyekDetailView(LoginRequiredMixin, GroupAccessMixin, DetailView):
     model = Proyek
+    use_replica = True
     template_name = 'core/proyek_detail.html'
 
-class ProyekDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class ProyekDeleteView(LoginRequiredMixin, UserPassesTestMixin, AuditedWriteMixin, DeleteView):
     model = Proyek
     template_name = 'core/confirm_delete.html'
     success_url = reverse_lazy('proyek-list')
@@ -209,123 +208,14 @@ def import_tugas(request):
         form = ImportTugasForm(request.POST, request.FILES)
         if form.is_valid():
             try:
-                wb = openpyxl.load_workbook(request.FILES['file_excel'])
-                ws = wb.active
-                
-                # UPDATE: Logika Sorting (Level 1 dulu, baru Level 2)
-                # Kita baca dulu semua baris ke dalam list of dictionary
-                raw_rows = []
-                for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                    if not row[0]: continue
-                    # Mapping kolom
-                    item = {
-                        'idx': idx,
-                        'nama': row[0],
-                        'tipe': (row[1] or 'ADHOC').upper().strip(),
-                        'kode_p': row[2],
-                        'pemberi': row[3],
-                        'pic_uname': row[4],
-                        'start': row[5],
-                        'end': row[6],
-                        'desc': row[7] or "",
-                        # Kolom baru (index 8 dan 9)
-                        'level': int(row[8]) if len(row) > 8 and row[8] else 1,
-                        'parent_name': str(row[9]).strip() if len(row) > 9 and row[9] else None
-                    }
-                    raw_rows.append(item)
-                
-                # SORTING: Proses Level 1 (Main Task) duluan agar parent tersedia saat Subtask dibuat
-                raw_rows.sort(key=lambda x: x['level'])
-                
-                success_count = 0
-                errors = []
-                created_tasks_cache = {} # Cache untuk menyimpan tugas yg baru dibuat di batch ini
-                
-                user_group = request.user.groups.first()
-                if not user_group and not request.user.is_superuser:
+                primary = get_primary_group(request.user)
+                user_group_id = primary[0] if primary else None
+                if not user_group_id and not request.user.is_superuser:
                     raise ValueError("User Anda tidak terdaftar dalam Divisi/Group manapun.")
 
-                with transaction.atomic():
-                    for row in raw_rows:
-                        try:
-                            # 1. Parsing Tanggal
-                            def parse_date(d):
-                                if isinstance(d, datetime): return d.date()
-                                if isinstance(d, str):
-                                    for f in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'): 
-                                        try: return datetime.strptime(d.strip(), f).date()
-                                        except: pass
-                                return d if isinstance(d, date) else None
-
-                            start = parse_date(row['start'])
-                            end = parse_date(row['end'])
-                            
-                            if not start or not end: raise ValueError("Format tanggal salah")
-                            if start.weekday() >= 5: raise ValueError("Tanggal Mulai hari libur (Sabtu/Minggu)")
-
-                            # 2. Cek Proyek
-                            proyek_obj = None
-                            if row['tipe'] == 'PROJECT':
-                                if not row['kode_p']: raise ValueError("Kode Proyek wajib diisi utk tipe PROJECT")
-                                proyek_obj = Proyek.objects.filter(kode_proyek=row['kode_p']).first()
-                                if not proyek_obj: raise ValueError(f"Proyek {row['kode_p']} tidak ditemukan")
-                            
-                            # 3. Cek PIC
-                            pic_user = None
-                            if row['pic_uname']:
-                                pic_user = User.objects.filter(username=row['pic_uname']).first()
-                                
-                            # 4. Handle Subtask (Level 2)
-                            parent_obj = None
-                            if row['level'] == 2:
-                                if not row['parent_name']:
-                                    raise ValueError("Level 2 (Subtask) wajib mengisi 'Nama Tugas Induk'")
-                                
-                                # Cari di cache batch ini dulu
-                                if row['parent_name'] in created_tasks_cache:
-                                    parent_obj = created_tasks_cache[row['parent_name']]
-                                else:
-                                    # Cari di database (di grup yg sama)
-                                    # Gunakan filter pemilik_grup agar tidak cross-division
-                                    qs = Tugas.objects.filter(nama_tugas=row['parent_name'])
-                                    if not request.user.is_superuser:
-                                        qs = qs.filter(pemilik_grup=user_group)
-                                    
-                                    parent_obj = qs.first()
-                                    
-                                if not parent_obj:
-                                    raise ValueError(f"Tugas Induk '{row['parent_name']}' tidak ditemukan.")
-
-                                # Warisi Proyek dari Induk jika tidak diisi
-                                if not proyek_obj and parent_obj.proyek:
-                                    proyek_obj = parent_obj.proyek
-
-                            # 5. Create
-                            new_task = Tugas.objects.create(
-                                nama_tugas=row['nama'],
-                                tipe_tugas=row['tipe'],
-                                proyek=proyek_obj,
-                                induk=parent_obj, # Link ke Parent
-                                pemberi_tugas=row['pemberi'] or request.user.get_full_name(),
-                                ditugaskan_ke=pic_user,
-                                tanggal_mulai=start,
-                                tenggat_waktu=end,
-                                deskripsi=row['desc'] if hasattr(Tugas, 'deskripsi') else "", # Optional check
-                                pemilik_grup=user_group if user_group else (proyek_obj.pemilik_grup if proyek_obj else None),
-                                status='TODO',
-                                progress=0
-                            )
-                            
-                            # Simpan ke cache agar bisa jadi induk bagi baris berikutnya
-                            created_tasks_cache[row['nama']] = new_task
-                            success_count += 1
-                            
-                        except Exception as e:
-                            errors.append(f"Baris {row['idx']} ({row['nama']}): {str(e)}")
-                
-                if success_count: messages.success(request, f"Sukses import {success_count} tugas.")
-                if errors: messages.warning(request, f"Gagal {len(errors)} data: " + "; ".join(errors[:3]))
-                return redirect('tugas-list')
+                # Diproses di background oleh `manage.py run_jobs`; browser memantau progress
+                job = enqueue('IMPORT_TUGAS', request.user, request.FILES['file_excel'], {'group_id': user_group_id})
+                return redirect('job-status', pk=job.pk)
 
             except Exception as e: messages.error(request, f"File Error: {str(e)}")
     else: form = ImportTugasForm()
@@ -351,43 +241,8 @@ def import_user(request):
         form = ImportUserForm(request.POST, request.FILES)
         if form.is_valid():
             try:
-                wb = openpyxl.load_workbook(request.FILES['file_excel'])
-                ws = wb.active
-                success_users, errors = [], []
-                
-                for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                    if not row[0]: continue
-                    try:
-                        with transaction.atomic():
-                            uname = str(row[0]).strip().lower().replace(" ", "")
-                            email, pwd = row[1], str(row[2]) if row[2] else "Default123"
-                            fname, lname = row[3] or "", row[4] or ""
-                            role, group_name = (str(row[5]).upper().strip() if row[5] else 'MEMBER'), str(row[6]).strip() if row[6] else None
-                            
-                            status_staf = str(row[7]).upper().strip() if len(row) > 7 and row[7] else 'ACTIVE'
-                            is_active_user = False if status_staf in ['INACTIVE', 'NONAKTIF', '0', 'FALSE'] else True
-
-                            if User.objects.filter(username=uname).exists(): raise ValueError(f"Username {uname} sudah ada")
-                            
-                            u = User.objects.create_user(username=uname, email=email, password=pwd)
-                            u.first_name = fname; u.last_name = lname
-                            u.is_active = is_active_user 
-                            u.is_staff = True 
-                            u.save()
-                            
-                            p, created = UserProfile.objects.get_or_create(user=u)
-                            p.role = role; p.save()
-                            
-                            if group_name:
-                                g, _ = Group.objects.get_or_create(name=group_name)
-                                u.groups.add(g)
-                            
-                            success_users.append(uname)
-                    except Exception as e: errors.append(f"Baris {idx} ({row[0]}): {str(e)}")
-                
-                if success_users: messages.success(request, f"Sukses buat user: {', '.join(success_users[:5])}...")
-                if errors: messages.warning(request, f"Gagal: {'; '.join(errors[:5])}")
-                return redirect('user-list')
+                job = enqueue('IMPORT_USER', request.user, request.FILES['file_excel'])
+                return redirect('job-status', pk=job.pk)
 
             except Exception as e: messages.error(request, f"File Error: {str(e)}")
     else: form = ImportUserForm()
@@ -415,27 +270,82 @@ def bulk_delete_users(request):
         else: messages.warning(request, "Tidak ada pengguna yang dipilih.")
     return redirect('user-list')
 
+# --- BACKGROUND JOB ---
+JOB_RETURN_URLS = {'IMPORT_TUGAS': 'tugas-list', 'IMPORT_USER': 'user-list'}
+
+def get_user_job(request, pk):
+    job = get_object_or_404(BackgroundJob, pk=pk)
+    if not (request.user.is_superuser or job.user_id == request.user.id): return None
+    return job
+
+@login_required
+def job_status(request, pk):
+    job = get_user_job(request, pk)
+    if not job: return HttpResponseForbidden("Akses ditolak.")
+    return render(request, 'core/job_status.html', {'job': job, 'return_url': JOB_RETURN_URLS.get(job.kind, 'dashboard')})
+
+@login_required
+def job_status_api(request, pk):
+    job = get_user_job(request, pk)
+    if not job: return JsonResponse({'error': 'Permission denied'}, status=403)
+    return JsonResponse(job_payload(job))
+
 # --- TUGAS VIEWS ---
 class TugasListView(LoginRequiredMixin, GroupAccessMixin, ListView):
     model = Tugas
+    use_replica = True  # read-only: boleh dibaca dari replica
     template_name = 'core/tugas_list.html'
     context_object_name = 'tugas_list'
+    page_size = 24
+    # Kolom yang benar-benar dirender di kartu tugas
+    list_fields = (
+        'id', 'kode_tugas', 'nama_tugas', 'tipe_tugas', 'status', 'progress', 'pemberi_tugas',
+        'tanggal_mulai', 'tenggat_waktu', 'tanggal_mulai_aktual', 'tanggal_selesai_aktual',
+        'proyek__nama_proyek', 'induk__nama_tugas', 'ditugaskan_ke__username', 'ditugaskan_ke__first_name',
+    )
     
     def get_queryset(self):
-        qs = super().get_queryset()
-        assignee_id = self.request.GET.get('assignee')
-        if assignee_id: qs = qs.filter(ditugaskan_ke_id=assignee_id)
-        return qs.order_by('kode_tugas')
+        # Keyset pagination di atas kode_tugas (unique -> ber-index): tanpa OFFSET dan tanpa COUNT(*)
+        qs = apply_task_filters(super().get_queryset(), self.request.GET)
+        qs = qs.select_related('proyek', 'induk', 'ditugaskan_ke').only(*self.list_fields)
+        after, before = self.request.GET.get('after'), self.request.GET.get('before')
+        n = self.page_size
+
+        if before:
+            rows = list(qs.filter(kode_tugas__lt=before).order_by('-kode_tugas')[:n + 1])
+            self.has_prev, self.has_next = len(rows) > n, True
+            rows = rows[:n][::-1]
+        else:
+            if after: qs = qs.filter(kode_tugas__gt=after)
+            rows = list(qs.order_by('kode_tugas')[:n + 1])
+            self.has_next, self.has_prev = len(rows) > n, bool(after)
+            rows = rows[:n]
+        return rows
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_superuser:
+        user = self.request.user
+        if user.is_superuser:
             context['team_members'] = User.objects.filter(is_active=True).order_by('first_name')
         else:
-            context['team_members'] = User.objects.filter(groups__in=get_accessible_groups(self.request.user), is_active=True).distinct()
+            context['team_members'] = User.objects.filter(groups__in=get_accessible_group_ids(user), is_active=True).distinct()
+        projects = visible_projects(user)
+
+        rows = self.object_list
+        params = self.request.GET.copy()
+        for k in ('after', 'before'): params.pop(k, None)
+        context.update({
+            'project_options': projects.order_by('kode_proyek').values('id', 'kode_proyek', 'nama_proyek'),
+            'status_choices': Tugas.STATUS_CHOICES,
+            'tipe_choices': Tugas.TIPE_CHOICES,
+            'filter_query': params.urlencode(),
+            'is_filtered': any(self.request.GET.get(k) for k in TASK_FILTER_KEYS),
+            'next_cursor': rows[-1].kode_tugas if rows and self.has_next else None,
+            'prev_cursor': rows[0].kode_tugas if rows and self.has_prev else None,
+        })
         return context
 
-class TugasCreateView(LoginRequiredMixin, CreateView):
+class TugasCreateView(LoginRequiredMixin, AuditedWriteMixin, CreateView):
     model = Tugas
     form_class = TugasForm
     template_name = 'core/tugas_form.html'
@@ -459,16 +369,16 @@ class TugasCreateView(LoginRequiredMixin, CreateView):
         
     def form_valid(self, form):
         if not self.request.user.is_superuser:
-            user_group = self.request.user.groups.first()
+            user_group = get_primary_group(self.request.user)
             if not user_group: 
                 form.add_error(None, "User tidak punya grup.")
                 return self.form_invalid(form)
-            form.instance.pemilik_grup = user_group
+            form.instance.pemilik_grup_id = user_group[0]
             
         log_activity(self.request.user, 'CREATE', 'Tugas', form.instance.kode_tugas, f"Created: {form.instance.nama_tugas}")
         return super().form_valid(form)
 
-class TugasUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class TugasUpdateView(LoginRequiredMixin, UserPassesTestMixin, AuditedWriteMixin, UpdateView):
     model = Tugas
     form_class = TugasForm
     template_name = 'core/tugas_form.html'
@@ -496,7 +406,12 @@ class TugasUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
             log_activity(self.request.user, 'UPDATE', 'Tugas', self.object.kode_tugas, f"Changed: {', '.join(form.changed_data)}")
         return super().form_valid(form)
 
-class TugasDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['breadcrumb'] = self.object.ancestors()
+        return context
+
+class TugasDeleteView(LoginRequiredMixin, UserPassesTestMixin, AuditedWriteMixin, DeleteView):
     model = Tugas
     template_name = 'core/confirm_delete.html'
     success_url = reverse_lazy('tugas-list')
@@ -504,27 +419,31 @@ class TugasDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     def test_func(self): 
         return is_admin(self.request.user) or self.request.user.is_superuser
         
-    def delete(self, request, *args, **kwargs):
-        log_activity(request.user, 'DELETE', 'Tugas', self.get_object().kode_tugas, f"Deleted: {self.get_object().nama_tugas}")
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        # Hapus seluruh subtree sekaligus (range query di materialized path)
+        subtree = self.object.descendants(include_self=True)
+        count = subtree.count()
+        log_activity(self.request.user, 'DELETE', 'Tugas', self.object.kode_tugas, f"Deleted: {self.object.nama_tugas}" + (f" (+{count - 1} subtask)" if count > 1 else ""))
+        subtree.delete()
+        return redirect(self.get_success_url())
 
 # --- API HELPERS ---
 @login_required
-def get_entity_dates_api(request): return JsonResponse({}) 
+async def get_entity_dates_api(request): return JsonResponse({}) 
 
 @login_required
 def update_progress_api(request, pk):
     if request.method == 'POST':
         try:
             d = json.loads(request.body); prog = int(d.get('progress', 0))
-            t = get_object_or_404(Tugas, pk=pk)
-            t.progress = prog
-            if prog == 100: t.status = 'DONE'
-            elif prog > 0 and t.status == 'TODO': t.status = 'IN_PROGRESS'
-            elif prog == 0: t.status = 'TODO'
-            t.save()
-            log_activity(request.user, 'UPDATE', 'Tugas', t.kode_tugas, f"Progress: {prog}%")
-            return JsonResponse({'status': 'success', 'new_status': t.get_status_display()})
+            row = load_state(pk)
+            if row is None: return JsonResponse({'error': 'Tugas tidak ditemukan'}, status=404)
+            # Fast path: UPDATE bersyarat versi, hanya kolom yang berubah
+            with audited_atomic():
+                new = fast_update(row, d.get('version'), progress=prog, status=progress_status(prog, row['status']))
+                log_activity(request.user, 'UPDATE', 'Tugas', row['kode_tugas'], f"Progress: {prog}%")
+            return JsonResponse({'status': 'success', 'new_status': STATUS_LABELS[new['status']], 'task': task_state(new)})
+        except VersionConflict as e: return JsonResponse({'error': str(e), 'task': task_state(e.current)}, status=409)
         except Exception as e: return JsonResponse({'error': str(e)}, status=400)
     return JsonResponse({'error': 'Invalid'}, status=405)
 
@@ -536,79 +455,136 @@ def update_task_date_api(request, pk):
             s = datetime.strptime(d.get('start'), "%Y-%m-%d").date()
             e = datetime.strptime(d.get('end'), "%Y-%m-%d").date()
             if s.weekday() >= 5: return JsonResponse({'error': 'Hari Libur!'}, status=400)
-            t = get_object_or_404(Tugas, pk=pk)
-            if not (request.user.is_superuser or is_admin(request.user) or is_leader(request.user) or t.ditugaskan_ke == request.user):
+            row = load_state(pk)
+            if row is None: return JsonResponse({'error': 'Tugas tidak ditemukan'}, status=404)
+            if not (request.user.is_superuser or is_admin(request.user) or is_leader(request.user) or row['ditugaskan_ke_id'] == request.user.id):
                 return JsonResponse({'error': 'Permission denied'}, status=403)
-            t.tanggal_mulai = s; t.tenggat_waktu = e; t.save()
-            log_activity(request.user, 'UPDATE', 'Tugas', t.kode_tugas, f"Gantt: {s}->{e}")
-            return JsonResponse({'status': 'success'})
+            with audited_atomic():
+                new = fast_update(row, d.get('version'), tanggal_mulai=s, tenggat_waktu=e)
+                # Turunan yang jadi bentrok ikut digeser (satu bulk_update)
+                shifted = reschedule(Tugas(pk=row['id'], proyek_id=row['proyek_id']))
+                if shifted: invalidate_tasks(shifted)  # bulk_update turunan tidak memicu post_save
+                log_activity(request.user, 'UPDATE', 'Tugas', row['kode_tugas'], f"Gantt: {s}->{e}" + (f" (+{len(shifted)} turunan digeser)" if shifted else ""))
+            return JsonResponse({'status': 'success', 'task': task_state(new), 'shifted': {str(i): [str(a), str(b)] for i, (a, b) in shifted.items()}})
+        except VersionConflict as e: return JsonResponse({'error': str(e), 'task': task_state(e.current)}, status=409)
         except Exception as e: return JsonResponse({'error': str(e)}, status=400)
     return JsonResponse({'error': 'Invalid'}, status=405)
 
-# --- GANTT & CALENDAR ---
 @login_required
-def gantt_data(request):
+def batch_update_api(request):
+    # Banyak perubahan progress/tanggal/status sekaligus (Gantt menggabungkan edit yang tertunda)
+    if request.method != 'POST': return JsonResponse({'error': 'Invalid'}, status=405)
+    try: changes = json.loads(request.body).get('changes')
+    except (ValueError, AttributeError): changes = None
+    if not isinstance(changes, list) or not changes: return JsonResponse({'error': 'Body harus berisi {"changes": [...]}'}, status=400)
+    if len(changes) > MAX_BATCH: return JsonResponse({'error': f'Maksimal {MAX_BATCH} perubahan per request'}, status=400)
+
     user = request.user
-    if user.is_superuser: tasks = Tugas.objects.all()
-    else:
-        accessible_groups = get_accessible_groups(user)
-        tasks = Tugas.objects.filter(Q(pemilik_grup__in=accessible_groups) | Q(ditugaskan_ke=user)).distinct()
-        
-    if request.GET.get('assignee'): tasks = tasks.filter(ditugaskan_ke_id=request.GET.get('assignee'))
-    
-    gantt_list = []
-    visible_ids = set(tasks.values_list('id', flat=True))
-    
-    for p in Proyek.objects.filter(id__in=tasks.values_list('proyek_id', flat=True)).distinct():
-        gantt_list.append({'id': f"P-{p.id}", 'name': f"📁 {p.nama_proyek}", 'start': str(p.tanggal_mulai), 'end': str(p.tanggal_selesai), 'progress': 0, 'custom_class': 'bar-project', 'read_only': True})
-        for t in tasks.filter(proyek=p):
-            dep = str(t.tergantung_pada.id) if t.tergantung_pada and t.tergantung_pada.id in visible_ids else ""
-            cls = 'bar-done' if t.status=='DONE' else ('bar-overdue' if t.status=='OVERDUE' else ('bar-hold' if t.status=='ON_HOLD' else ''))
-            gantt_list.append({'id': str(t.id), 'name': t.nama_tugas, 'start': str(t.tanggal_mulai), 'end': str(t.tenggat_waktu), 'progress': t.progress, 'dependencies': dep, 'custom_class': cls})
-            
-    for t in tasks.filter(proyek__isnull=True):
-        dep = str(t.tergantung_pada.id) if t.tergantung_pada and t.tergantung_pada.id in visible_ids else ""
-        cls = 'bar-done' if t.status=='DONE' else ('bar-overdue' if t.status=='OVERDUE' else ('bar-hold' if t.status=='ON_HOLD' else ''))
-        gantt_list.append({'id': str(t.id), 'name': t.nama_tugas, 'start': str(t.tanggal_mulai), 'end': str(t.tenggat_waktu), 'progress': t.progress, 'dependencies': dep, 'custom_class': cls})
+    privileged = user.is_superuser or is_admin(user) or is_leader(user)
+    results, shifted = apply_batch(user, changes, lambda t: privileged or t.ditugaskan_ke_id == user.id)
+    return JsonResponse({'results': results, 'shifted': {str(i): [str(a), str(b)] for i, (a, b) in shifted.items()}})
+
+# --- GANTT & CALENDAR ---
+@replica_read
+@login_required
+async def gantt_data(request):
+    user = await request.auser()
+    group_ids = await sync_to_async(get_accessible_group_ids)(user)
+    tasks = visible_tasks(user)  # grup akses sudah di-memo di objek user, tidak ada query di sini
+
+    assignee = request.GET.get('assignee')
+    if assignee: tasks = tasks.filter(ditugaskan_ke_id=assignee)
 
-    return JsonResponse(gantt_list, safe=False)
+    # Payload JSON di-cache per scope; cache hit tidak menjalankan query sama sekali
+    body = await acached_json('gantt', user, group_ids, {'assignee': assignee or ''}, lambda: abuild_gantt_data(tasks))
+    return HttpResponse(body, content_type='application/json')
 
 @login_required
 def gantt_view(request): 
     if request.user.is_superuser: team = User.objects.all()
-    else: team = User.objects.filter(groups__in=get_accessible_groups(request.user)).distinct()
+    else: team = User.objects.filter(groups__in=get_accessible_group_ids(request.user)).distinct()
     return render(request, 'core/gantt.html', {'team_members': team})
 
+GANTT_EXPORT_HEADERS = [
+    'Kode Tugas', 'Level', 'Kode Induk', 'Nama Tugas', 'Tipe', 'Proyek', 'PIC', 'Status', 'Progress (%)',
+    'Start (Plan)', 'End (Plan)', 'Start (Actual)', 'End (Actual)',
+]
+GANTT_EXPORT_WIDTHS = [14, 8, 14, 40, 10, 30, 18, 14, 12, 14, 14, 14, 14]
+
+def gantt_export_rows(tasks):
+    # Urut kode_tugas -> subtask langsung di bawah induknya; dibaca per chunk lewat iterator()
+    rows = tasks.order_by('kode_tugas').values_list(
+        'kode_tugas', 'induk__kode_tugas', 'nama_tugas', 'tipe_tugas', 'proyek__nama_proyek', 'ditugaskan_ke__username',
+        'status', 'progress', 'tanggal_mulai', 'tenggat_waktu', 'tanggal_mulai_aktual', 'tanggal_selesai_aktual',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    # Tipe & status ditulis sebagai label tampilan (seperti di UI), bukan kode DB
+    tipe_label, status_label = dict(Tugas.TIPE_CHOICES), dict(Tugas.STATUS_CHOICES)
+    for kode, induk, nama, tipe, proyek, pic, status, *rest in rows:
+        yield (kode, kode.count('.') + 1, induk, nama, tipe_label.get(tipe, tipe), proyek, pic, status_label.get(status, status), *rest)
+
+@replica_read
 @login_required
-def export_gantt_excel(request): return HttpResponse("Export OK")
+def export_gantt_excel(request):
+    tasks = visible_tasks(request.user)
+    if request.GET.get('assignee'): tasks = tasks.filter(ditugaskan_ke_id=request.GET.get('assignee'))
+
+    response = StreamingHttpResponse(streaming_body(request, stream_xlsx('Gantt', GANTT_EXPORT_HEADERS, gantt_export_rows(tasks), GANTT_EXPORT_WIDTHS)), content_type=XLSX_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename=Gantt_Export_{date.today():%Y%m%d}.xlsx'
+    return response
+
+@replica_read
+@login_required
+def export_data(request, dataset):
+    # Export streaming CSV/NDJSON untuk BI; filter sama dengan daftar tugas
+    if dataset not in EXPORT_DATASETS: return JsonResponse({'error': 'Dataset tidak dikenal'}, status=404)
+    if dataset == 'audit' and not request.user.is_superuser: return HttpResponseForbidden("Hanya Superuser.")
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS: return JsonResponse({'error': 'Format harus csv atau ndjson'}, status=400)
+
+    columns, rows = export_rows(dataset, request.user, request.GET)
+    response = StreamingHttpResponse(streaming_body(request, stream_export(fmt, columns, rows)), content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename={dataset}_{date.today():%Y%m%d}.{fmt}'
+    return response
 
 @login_required
 def calendar_view(request): return render(request, 'core/calendar.html')
 
+def parse_window_date(value):
+    # FullCalendar mengirim ISO datetime (mis. 2025-02-01T00:00:00+07:00); cukup ambil bagian tanggal
+    if not value: return None
+    try: return date.fromisoformat(value[:10])
+    except ValueError: return None
+
+CALENDAR_COLORS = {'DONE': '#198754', 'OVERDUE': '#dc3545', 'ON_HOLD': '#ffc107', 'IN_PROGRESS': '#0dcaf0'}
+
+def calendar_event(t):
+    color = CALENDAR_COLORS.get(t['status'], '#0d6efd')
+    end_date = t['tenggat_waktu'] + timedelta(days=1)
+    return {
+        'title': f"{t['nama_tugas']} ({t['progress']}%)",
+        'start': str(t['tanggal_mulai']),
+        'end': str(end_date), 
+        'backgroundColor': color,
+        'borderColor': color,
+        'url': f"/tugas/{t['id']}/update/" 
+    }
+
+@replica_read
 @login_required
-def calendar_data(request):
-    user = request.user
-    if user.is_superuser: tasks = Tugas.objects.all()
-    else: tasks = Tugas.objects.filter(Q(pemilik_grup__in=get_accessible_groups(user)) | Q(ditugaskan_ke=user)).distinct()
+async def calendar_data(request):
+    user = await request.auser()
+    group_ids = await sync_to_async(get_accessible_group_ids)(user)
+    tasks = visible_tasks(user)  # grup akses sudah di-memo di objek user, tidak ada query di sini
     
-    events = []
-    for t in tasks:
-        color = '#0d6efd' 
-        if t.status == 'DONE': color = '#198754' 
-        elif t.status == 'OVERDUE': color = '#dc3545' 
-        elif t.status == 'ON_HOLD': color = '#ffc107' 
-        elif t.status == 'IN_PROGRESS': color = '#0dcaf0' 
-        
-        end_date = t.tenggat_waktu + timedelta(days=1)
-        events.append({
-            'title': f"{t.nama_tugas} ({t.progress}%)",
-            'start': str(t.tanggal_mulai),
-            'end': str(end_date), 
-            'backgroundColor': color,
-            'borderColor': color,
-            'url': f"/tugas/{t.pk}/update/" 
-        })
-    return JsonResponse(events, safe=False)
+    # Hanya tugas yang overlap dengan jendela [start, end) yang sedang ditampilkan (index tugas_mulai_tenggat_idx)
+    start, end = parse_window_date(request.GET.get('start')), parse_window_date(request.GET.get('end'))
+    if end: tasks = tasks.filter(tanggal_mulai__lt=end)
+    if start: tasks = tasks.filter(tenggat_waktu__gte=start)
+
+    async def build():
+        return [calendar_event(t) async for t in tasks.values('id', 'nama_tugas', 'progress', 'status', 'tanggal_mulai', 'tenggat_waktu')]
+    body = await acached_json('calendar', user, group_ids, {'start': str(start), 'end': str(end)}, build)
+    return HttpResponse(body, content_type='application/json')
 
 # --- BAU VIEWS ---
 class TemplateBAUListView(LoginRequiredMixin, GroupAccessMixin, ListView):
@@ -622,7 +598,8 @@ class TemplateBAUCreateView(LoginRequiredMixin, CreateView):
     template_name = 'core/bau_form.html'
     success_url = reverse_lazy('bau-list')
     def form_valid(self, form):
-        form.instance.pemilik_grup = self.request.user.groups.first()
+        user_group = get_primary_group(self.request.user)
+        form.instance.pemilik_grup_id = user_group[0] if user_group else None
         return super().form_valid(form)
 
 class TemplateBAUUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
@@ -640,4 +617,9 @@ class TemplateBAUDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView)
 
 @login_required
 def trigger_bau_single(request, pk):
+    if not is_admin(request.user): return HttpResponseForbidden("Hanya Admin.")
+    tmpl = get_object_or_404(TemplateBAU, pk=pk)
+    count = generate_bau(templates=[tmpl])
+    if count: messages.success(request, f"Tugas periode ini untuk '{tmpl.nama_tugas}' berhasil dibuat.")
+    else: messages.info(request, f"Tugas periode ini untuk '{tmpl.nama_tugas}' sudah ada.")
     return redirect('bau-list')
\ No newline at end of file
@@ -31,13 +31,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # WAJIB UNTUK CSS DI CLOUD
+    'core.middleware.StaticFilesMiddleware', # WhiteNoise (WAJIB UNTUK CSS DI CLOUD), aman untuk ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.routers.ReplicaRoutingMiddleware', # View read-only -> replica (jika dikonfigurasi)
 ]
 
 ROOT_URLCONF = 'risk_tracker.urls'
@@ -53,12 +54,15 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.user_group',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'risk_tracker.wsgi.application'
+# ASGI (uvicorn worker): endpoint JSON Gantt/kalender async, lihat Procfile
+ASGI_APPLICATION = 'risk_tracker.asgi.application'
 
 # Database Setup (Smart Switch)
 # Jika di Render/Railway (ada DATABASE_URL), pakai PostgreSQL.
@@ -82,6 +86,36 @@ if database_url:
         conn_health_checks=True,
     )
 
+# 3. Read Replica (opsional): view laporan (dashboard, Gantt, kalender, daftar, export) membaca dari sini.
+# Lokal bisa dites dengan dua file SQLite, mis. DATABASE_REPLICA_URL=sqlite:///db_replica.sqlite3
+replica_url = os.environ.get("DATABASE_REPLICA_URL")
+
+if replica_url:
+    DATABASES['replica'] = dj_database_url.parse(replica_url, conn_max_age=600, conn_health_checks=True)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# 4. Profil SQLite produksi (single server dengan beberapa worker gunicorn), opt-in: SQLITE_PRODUCTION_PROFILE=1.
+# Tidak aktif default agar db.sqlite3 bawaan repo tidak diubah ke WAL (dan tidak muncul file -wal/-shm).
+# Writer (alias 'default') memakai BEGIN IMMEDIATE + timeout; PRAGMA (WAL dkk) dipasang di core/sqlite.py.
+SQLITE_PRODUCTION_PROFILE = os.environ.get("SQLITE_PRODUCTION_PROFILE", "").lower() in ("1", "true", "yes")
+# Satu sumber lama tunggu lock (detik): OPTIONS['timeout'] dan PRAGMA busy_timeout diturunkan dari sini
+SQLITE_TIMEOUT = float(os.environ.get("SQLITE_TIMEOUT", 20))
+
+if SQLITE_PRODUCTION_PROFILE and DATABASES['default']['ENGINE'].endswith('sqlite3'):
+    DATABASES['default'].setdefault('OPTIONS', {}).update({'transaction_mode': 'IMMEDIATE', 'timeout': SQLITE_TIMEOUT})
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -65536)),
+    'temp_store': 'MEMORY',
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Lama (detik) request user tetap ke primary setelah ia melakukan write (read-your-writes)
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -99,11 +133,29 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
-# Kompresi file statis agar ringan diakses
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Kompresi file statis agar ringan diakses (Django 5.1+ hanya membaca STORAGES, bukan STATICFILES_STORAGE)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
 
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Cache: Redis jika REDIS_URL ada (dibagi semua worker, incr atomik untuk generation counter).
+# Tanpa REDIS_URL: LocMem per proses. Invalidasi (bump generation/version) dari proses lain -- worker
+# gunicorn lain, `run_jobs`, cron sweep_overdue/generate_bau -- tidak terlihat di sana, jadi cache lintas
+# request (akses grup, payload Gantt/kalender, statistik dashboard) hanya aktif jika CACHE_SHARED.
+redis_url = os.environ.get("REDIS_URL")
+CACHE_SHARED = bool(redis_url)
+
+if redis_url:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': redis_url}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'risk-tracker', 'OPTIONS': {'MAX_ENTRIES': 5000}}}
+
+# Audit Log: jumlah bulan di tabel aktif, sisanya dipindah oleh `manage.py archive_audit`
+AUDIT_RETENTION_MONTHS = int(os.environ.get('AUDIT_RETENTION_MONTHS', 6))